@@ -0,0 +1,340 @@
+"""Background enforcement of the on-disk cache size and age budgets."""
+import os
+import time
+import shutil
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DirectoryStore(ABC):
+    """A cache directory with running file count and byte totals.
+
+    The directory is scanned once on startup; after that the totals are
+    updated as files are written through ``add_file`` and as entries are
+    evicted, so reporting usage never touches the disk. ``clear`` swaps in
+    an empty directory and deletes the old one on a background thread, and
+    bumps ``epoch`` so writers that started before it can tell (see ``commit``).
+    """
+
+    def __init__(self, name, cache_dir):
+        self.name = name
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self.bytes = 0
+        self.epoch = 0
+        self._lock = threading.Lock()
+        self._reset()
+        for entry in os.scandir(self.cache_dir):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.is_file():
+                self._add(entry.name, stat.st_mtime, stat.st_size)
+        # Remove directories swapped out by a clear that was interrupted
+        for trash in self.cache_dir.parent.glob(f"{self.cache_dir.name}.trash-*"):
+            self._delete_in_background(trash)
+
+    @abstractmethod
+    def _reset(self):
+        """Drop the per-entry bookkeeping, e.g. after the directory was emptied."""
+
+    @abstractmethod
+    def _add(self, name, mtime, size):
+        """Account for one file of the cache directory."""
+
+    def add_file(self, path):
+        """Account for a file just written into the cache directory."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._add(Path(path).name, stat.st_mtime, stat.st_size)
+
+    def commit(self, epoch, write):
+        """Run ``write`` unless the store was cleared since ``epoch``. Returns True if it ran.
+
+        ``write`` runs under the store lock, so a concurrent ``clear`` either
+        happens first and is detected, or waits until the write is done.
+        """
+        with self._lock:
+            if self.epoch != epoch:
+                return False
+            write()
+            return True
+
+    def _unlink(self, name, size):
+        (self.cache_dir / name).unlink(missing_ok=True)
+        self.count -= 1
+        self.bytes -= size
+
+    def usage(self):
+        return {"count": self.count, "bytes": self.bytes}
+
+    def clear(self):
+        """Empty the store by swapping in a new directory. Returns the number of files removed."""
+        with self._lock:
+            removed = self.count
+            trash = self.cache_dir.with_name(f"{self.cache_dir.name}.trash-{time.time_ns()}")
+            os.rename(self.cache_dir, trash)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.count = 0
+            self.bytes = 0
+            self.epoch += 1
+            self._reset()
+        self._delete_in_background(trash)
+        return removed
+
+    @staticmethod
+    def _delete_in_background(path):
+        threading.Thread(
+            target=shutil.rmtree, args=(path,), kwargs={"ignore_errors": True},
+            name="cache-clear", daemon=True,
+        ).start()
+
+
+class _FrameSet:
+    __slots__ = ("last_used", "size", "files", "indexed")
+
+    def __init__(self):
+        self.last_used = 0
+        self.size = 0
+        self.files = {}
+        self.indexed = False
+
+
+class FramedStore(DirectoryStore):
+    """Framed frame sets: a ``<key>.json`` index plus its ``<key>_frame_*.jpg`` files.
+
+    A set's last use is the mtime of its JSON file, which the Framed game
+    touches on every cache hit. Evicting a set unlinks the JSON first, so the
+    set stops being served before any of its frames disappear.
+    """
+
+    def __init__(self, cache_dir):
+        super().__init__("framed", cache_dir)
+
+    def _reset(self):
+        self._sets = {}
+
+    @staticmethod
+    def _set_key(name):
+        if name.endswith(".json"):
+            return name[:-len(".json")]
+        if "_frame_" in name:
+            return name.split("_frame_", 1)[0]
+        return None
+
+    def _add(self, name, mtime, size):
+        key = self._set_key(name)
+        if key is None:
+            return
+        frame_set = self._sets.setdefault(key, _FrameSet())
+        previous = frame_set.files.get(name)
+        if previous is None:
+            self.count += 1
+        else:
+            frame_set.size -= previous
+            self.bytes -= previous
+        frame_set.files[name] = size
+        frame_set.size += size
+        self.bytes += size
+        if name.endswith(".json"):
+            frame_set.indexed = True
+            frame_set.last_used = mtime
+        elif not frame_set.indexed:
+            frame_set.last_used = max(frame_set.last_used, mtime)
+
+    def touch(self, key):
+        """Mark a frame set as just used."""
+        with self._lock:
+            frame_set = self._sets.get(key)
+            if frame_set is not None:
+                frame_set.last_used = time.time()
+
+    def entries(self):
+        with self._lock:
+            return [(s.last_used, s.size, key) for key, s in self._sets.items() if s.indexed]
+
+    def expire(self, cutoff, grace_cutoff):
+        with self._lock:
+            stale = [key for key, s in self._sets.items() if s.indexed and s.last_used < cutoff]
+            # Frames without an index are left over from an interrupted eviction or
+            # extraction; the grace period spares extractions still in progress
+            leftovers = [key for key, s in self._sets.items() if not s.indexed and s.last_used < grace_cutoff]
+        self.evict(stale + leftovers)
+        return len(stale)
+
+    def evict(self, keys):
+        with self._lock:
+            for key in keys:
+                frame_set = self._sets.pop(key, None)
+                if frame_set is None:
+                    continue
+                index_name = f"{key}.json"
+                if index_name in frame_set.files:
+                    self._unlink(index_name, frame_set.files.pop(index_name))
+                for name, size in frame_set.files.items():
+                    self._unlink(name, size)
+
+
+class FileStore(DirectoryStore):
+    """A directory of independent cache files, each evicted on its own."""
+
+    def _reset(self):
+        self._files = {}
+
+    def _add(self, name, mtime, size):
+        previous = self._files.get(name)
+        if previous is None:
+            self.count += 1
+        else:
+            self.bytes -= previous[1]
+        self._files[name] = (mtime, size)
+        self.bytes += size
+
+    def entries(self):
+        with self._lock:
+            return [(mtime, size, name) for name, (mtime, size) in self._files.items()]
+
+    def expire(self, cutoff, grace_cutoff):
+        stale = [name for mtime, _, name in self.entries() if mtime < cutoff]
+        self.evict(stale)
+        return len(stale)
+
+    def evict(self, keys):
+        with self._lock:
+            for name in keys:
+                entry = self._files.pop(name, None)
+                if entry is not None:
+                    self._unlink(name, entry[1])
+
+
+class TMDbStore:
+    """Entries of the SQLite-backed ``TMDbCache``, ordered by last access.
+
+    TMDb metadata barely changes and is prefetched only once, so entries are
+    not aged out; only negative entries past their TTL are expired.
+    """
+
+    name = "tmdb"
+
+    def __init__(self, tmdb_cache):
+        self.cache = tmdb_cache
+
+    def usage(self):
+        return {"count": self.cache.count(), "bytes": self.cache.size_bytes()}
+
+    def entries(self):
+        return self.cache.eviction_candidates()
+
+    def expire(self, cutoff, grace_cutoff):
+        return self.cache.expire_negatives()
+
+    def evict(self, keys):
+        self.cache.evict(keys)
+
+
+class CacheManager:
+    """Keeps the framed, cast match and TMDb caches within their budgets.
+
+    Every ``CACHE_CLEANUP_INTERVAL`` seconds a background thread removes
+    stale entries (file cache entries older than ``CACHE_MAX_AGE_DAYS``,
+    expired negative TMDb entries) and then, if the stores together exceed
+    ``CACHE_MAX_SIZE_MB``, evicts the least recently used entries across
+    all stores until usage is back under ``CACHE_EVICTION_TARGET`` of the
+    budget. Entries used within the last ``CACHE_IN_USE_SECONDS`` are never
+    evicted, so a game in progress keeps its frames.
+    """
+
+    def __init__(self, stores, max_bytes=None, max_age=None, interval=None):
+        from .constants import CACHE_CLEANUP_INTERVAL, CACHE_MAX_AGE_DAYS, CACHE_MAX_SIZE_MB
+
+        self.stores = stores
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_MAX_SIZE_MB * 1024 * 1024
+        self.max_age = max_age if max_age is not None else CACHE_MAX_AGE_DAYS * 24 * 3600
+        self.interval = interval if interval is not None else CACHE_CLEANUP_INTERVAL
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+
+    def start(self):
+        """Start the background cleanup thread."""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run_loop, name="cache-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run_loop(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        """Expire stale entries, then evict LRU entries until under budget."""
+        from .constants import CACHE_EVICTION_TARGET, CACHE_IN_USE_SECONDS
+
+        with self._lock:
+            started = time.time()
+            in_use_cutoff = started - CACHE_IN_USE_SECONDS
+            report = {"expired": {}, "evicted": {}, "usage_bytes": {}}
+            candidates = []
+            total = 0
+
+            for store in self.stores:
+                try:
+                    report["expired"][store.name] = store.expire(started - self.max_age, in_use_cutoff)
+                    entries = store.entries()
+                except Exception as e:
+                    logger.error(f"Cache janitor could not scan the {store.name} cache: {e}")
+                    continue
+                usage = store.usage()["bytes"]
+                report["usage_bytes"][store.name] = usage
+                total += usage
+                candidates.extend((last_used, size, key, store) for last_used, size, key in entries)
+
+            if total > self.max_bytes:
+                target = self.max_bytes * CACHE_EVICTION_TARGET
+                to_evict = {}
+                candidates.sort(key=lambda c: c[0])
+                for last_used, size, key, store in candidates:
+                    if total <= target or last_used >= in_use_cutoff:
+                        break
+                    to_evict.setdefault(store, []).append(key)
+                    total -= size
+
+                for store, keys in to_evict.items():
+                    try:
+                        store.evict(keys)
+                        report["evicted"][store.name] = len(keys)
+                    except Exception as e:
+                        logger.error(f"Cache janitor could not evict from the {store.name} cache: {e}")
+
+            report["total_bytes"] = total
+            report["duration_seconds"] = round(time.time() - started, 3)
+            report["finished_at"] = time.time()
+            self.last_run = report
+
+            if any(report["expired"].values()) or report["evicted"]:
+                logger.info(
+                    f"Cache janitor expired {report['expired']} and evicted {report['evicted']}; "
+                    f"{total / (1024 * 1024):.1f} MB in use"
+                )
+            return report
+
+    def status(self):
+        return {
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "max_age_days": round(self.max_age / (24 * 3600), 2),
+            "interval_seconds": self.interval,
+            "last_run": self.last_run,
+        }
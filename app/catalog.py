@@ -0,0 +1,174 @@
+"""Compact, slotted records for the Plex library.
+
+The games only read a handful of fields from each title, so the library
+snapshot keeps these records instead of full plexapi objects, which carry
+their XML element, server reference and lazily loaded attributes around.
+Records are built straight from the section listing XML so that reading
+guids or actors never triggers a per-item reload from Plex.
+"""
+import threading
+
+
+class MediaPart:
+    """One file backing a movie."""
+
+    __slots__ = ("id", "file", "size")
+
+    def __init__(self, id, file, size=None):
+        self.id = id
+        self.file = file
+        self.size = size
+
+
+class MovieRecord:
+    """The subset of a Plex movie used by the trivia games."""
+
+    __slots__ = (
+        "rating_key",
+        "title",
+        "year",
+        "summary",
+        "thumb",
+        "tmdb_id",
+        "parts",
+        "actor_ids",
+        "updated_at",
+    )
+
+    def __init__(self, rating_key, title, year=None, summary=None, thumb=None,
+                 tmdb_id=None, parts=(), actor_ids=(), updated_at=None):
+        self.rating_key = rating_key
+        self.title = title
+        self.year = year
+        self.summary = summary
+        self.thumb = thumb
+        self.tmdb_id = tmdb_id
+        self.parts = parts
+        self.actor_ids = actor_ids
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"<MovieRecord {self.rating_key}: {self.title} ({self.year})>"
+
+
+class ShowRecord:
+    """The subset of a Plex show used for library listings."""
+
+    __slots__ = ("rating_key", "title", "year", "updated_at")
+
+    def __init__(self, rating_key, title, year=None, updated_at=None):
+        self.rating_key = rating_key
+        self.title = title
+        self.year = year
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_element(cls, elem):
+        """Build a record from a ``Directory`` element of a section listing."""
+        return cls(
+            rating_key=int(elem.attrib["ratingKey"]),
+            title=elem.attrib.get("title"),
+            year=_int(elem.attrib.get("year")),
+            updated_at=_int(elem.attrib.get("updatedAt")),
+        )
+
+
+class TMDbIndex:
+    """Two-way mapping between Plex rating keys and TMDb ids.
+
+    Built once per published library snapshot so lookups in either
+    direction, and the list of titles with TMDb metadata, never scan.
+    """
+
+    __slots__ = ("tmdb_by_key", "movie_by_tmdb", "movies")
+
+    def __init__(self, records):
+        self.tmdb_by_key = {}
+        self.movie_by_tmdb = {}
+        self.movies = []
+        for record in records:
+            if record.tmdb_id is None:
+                continue
+            self.tmdb_by_key[record.rating_key] = record.tmdb_id
+            # Keep the first copy when a film exists in several editions
+            self.movie_by_tmdb.setdefault(record.tmdb_id, record)
+            self.movies.append(record)
+
+    def __len__(self):
+        return len(self.movies)
+
+
+class MovieCatalog:
+    """Builds movie records and interns actor names into integer ids.
+
+    Actor ids are only ever appended, so ids held by older records stay valid
+    across library refreshes.
+    """
+
+    def __init__(self):
+        self.actor_names = []
+        self._actor_ids = {}
+        self._lock = threading.Lock()
+
+    def actor_id(self, name):
+        """Return the id for an actor name, assigning one if needed."""
+        actor_id = self._actor_ids.get(name)
+        if actor_id is None:
+            with self._lock:
+                actor_id = self._actor_ids.get(name)
+                if actor_id is None:
+                    actor_id = len(self.actor_names)
+                    self.actor_names.append(name)
+                    self._actor_ids[name] = actor_id
+        return actor_id
+
+    def actors_of(self, record):
+        """Return the actor names for a record in billing order."""
+        return [self.actor_names[actor_id] for actor_id in record.actor_ids]
+
+    def record_from_element(self, elem):
+        """Build a MovieRecord from a ``Video`` element of a section listing."""
+        parts = []
+        for part in elem.iterfind("Media/Part"):
+            if part.attrib.get("file"):
+                parts.append(MediaPart(
+                    _int(part.attrib.get("id")),
+                    part.attrib["file"],
+                    _int(part.attrib.get("size")),
+                ))
+
+        actor_ids = tuple(
+            self.actor_id(role.attrib["tag"])
+            for role in elem.iterfind("Role")
+            if role.attrib.get("tag")
+        )
+
+        return MovieRecord(
+            rating_key=int(elem.attrib["ratingKey"]),
+            title=elem.attrib.get("title"),
+            year=_int(elem.attrib.get("year")),
+            summary=elem.attrib.get("summary"),
+            thumb=elem.attrib.get("thumb"),
+            tmdb_id=_tmdb_id_from_guids(guid.attrib.get("id") for guid in elem.iterfind("Guid")),
+            parts=tuple(parts),
+            actor_ids=actor_ids,
+            updated_at=_int(elem.attrib.get("updatedAt")),
+        )
+
+
+def _tmdb_id_from_guids(guids):
+    """Extract the TMDb id from Plex guid strings such as ``tmdb://603``."""
+    for gid in guids:
+        if isinstance(gid, str) and gid.startswith("tmdb://"):
+            try:
+                return int(gid.split("tmdb://", 1)[1])
+            except ValueError:
+                continue
+    return None
+
+
+def _int(value):
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
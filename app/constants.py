@@ -1,15 +1,63 @@
 """Constants for the media server trivia app."""
 
+# Library snapshot settings
+LIBRARY_REFRESH_INTERVAL = 300  # 5 minutes between delta syncs with Plex
+PLEX_PAGE_SIZE = 500  # Items per section listing request
+PLEX_PAGE_WORKERS = 4  # Concurrent page fetches (and pooled HTTP connections)
+
+# Media path resolution
+PATH_RESOLVER_MISS_TTL = 300  # Seconds before a part with no readable file is checked again
+
+# Game eligibility
+ELIGIBILITY_RETRY_SECONDS = 6 * 3600  # Seconds before a movie rejected after a transient failure is tried again
+ELIGIBILITY_COLD_DRAWS = 10  # Movies checked per Framed/Quote draw before the first file scan finishes
+
 # Cache settings
 CACHE_CLEANUP_INTERVAL = 300  # 5 minutes
 CACHE_MAX_AGE_DAYS = 7
 CACHE_MAX_SIZE_MB = 1000
+CACHE_EVICTION_TARGET = 0.9  # Evict down to this fraction of CACHE_MAX_SIZE_MB
+CACHE_IN_USE_SECONDS = 600  # Entries used this recently are never evicted
+TMDB_CACHE_DB_PATH = "cache/tmdb_cache.db"
+TMDB_LEGACY_CACHE_DIR = "cache/tmdb_data"  # Pre-SQLite JSON files, migrated on startup
+TMDB_MEMORY_CACHE_ENTRIES = 2000  # Hot TMDb entries kept decoded in memory
+TMDB_MEMORY_CACHE_MB = 64
+
+# TMDb API settings
+TMDB_RATE_LIMIT_PER_SECOND = 40  # Stay under TMDb's per-IP request limit
+TMDB_RATE_LIMIT_BURST = 20
+TMDB_PREFETCH_WORKERS = 4  # Concurrent requests made by the prefetch job
+TMDB_PREFETCH_CAST_DEPTH = 6  # Top-billed cast members whose person details are prefetched
+TMDB_PREFETCH_ON_STARTUP = True
+TMDB_REQUEST_TIMEOUT = 10  # Seconds per HTTP request
+TMDB_MAX_RETRIES = 2  # Retries for timeouts, connection errors, 5xx and 429
+TMDB_RETRY_BACKOFF = 0.5  # Base delay in seconds, doubled per retry with full jitter
+TMDB_RETRY_BACKOFF_MAX = 8
+TMDB_RETRY_AFTER_MAX = 30  # Give up on a 429 whose Retry-After is longer than this
+TMDB_BREAKER_THRESHOLD = 5  # Consecutive failed requests before failing fast
+TMDB_BREAKER_COOLDOWN = 60  # Seconds to fail fast before trying TMDb again
+TMDB_NEGATIVE_TTL = 7 * 24 * 3600  # Seconds to remember a 404 or an empty person record
+TMDB_FAILURE_TTL = 300  # Seconds to remember a lookup that failed after retries
+
+# Game payload buffer
+GAME_BUFFER_DEPTHS = {  # Ready payloads kept per game; 0 disables buffering for that game
+    "trivia": 3,
+    "timeline": 3,
+    "year": 3,
+    "poster": 3,
+    "framed": 2,
+    "cast_match": 3,
+    "name_the_cast": 3,
+    "quote": 2,
+}
+GAME_BUFFER_MAX_ACTIVE_REQUESTS = 2  # Producers pause while more requests than this are in flight
+GAME_BUFFER_RETRY_SECONDS = 30  # Wait after a producer fails to build a game or is not ready to
 
 # Video processing settings
 DEFAULT_SAMPLE_RATE = 200
 MIN_SAMPLE_RATE = 50
 TARGET_FRAME_SAMPLES = 300
-VIDEO_BACKEND_TIMEOUT = 5
+VIDEO_BACKEND_TIMEOUT = 5  # Seconds the video backend may take to open a file or read a packet
 
 # Session management
 SESSION_TIMEOUT_SECONDS = 600  # 10 minutes
@@ -30,6 +78,36 @@ FRAMED_ROUNDS = 7
 FRAMED_FRAME_WIDTH = 1280
 FRAMED_FRAME_HEIGHT = 720
 FRAMED_CACHE_DIR = "cache/framed_frames"
+FRAMED_POOL_SIZE = 40  # Frames extracted per movie; each game samples FRAMED_ROUNDS of them
+FRAMED_FAST_SEEK = True  # Read nearby targets forward with grab() instead of seeking to each one
+FRAMED_SEQUENTIAL_READ_SECONDS = 3  # Targets this close to the decoder position are read forward, not seeked to
+FRAMED_SKIP_START_SECONDS = 120  # Opening logos and titles never make it into a pool
+FRAMED_SKIP_END_SECONDS = 360  # Neither do the end credits
+FRAMED_FRAME_ATTEMPTS = 4  # Frames tried per pool slot before leaving it empty
+FRAMED_FRAME_RETRY_SECONDS = 2  # How far past a rejected frame the next try is
+FRAMED_BAR_LUMA = 16  # Rows or columns darker than this are letterbox or pillarbox bars
+FRAMED_MIN_LUMA = 28  # Frames darker than this on average are rejected
+FRAMED_MAX_LUMA = 235  # Frames brighter than this on average are rejected
+FRAMED_MAX_DARK_FRACTION = 0.8  # Rejects text on black (credits, title cards)
+FRAMED_MIN_CONTRAST = 12  # Minimum luma standard deviation
+FRAMED_EDGE_THRESHOLD = 24  # Luma gradient that counts as an edge
+FRAMED_MIN_EDGE_DENSITY = 0.03  # Minimum fraction of edge pixels
+FRAMED_DUPLICATE_DISTANCE = 10  # dHash bits within which two frames count as the same shot
+FRAMED_POOL_MAX_TOP_UPS = 2  # Background passes that refill a pool left short by rejected frames
+FRAMED_EXTRACT_WORKERS = 2  # Frame extraction processes allowed to run at once
+FRAMED_EXTRACT_TIMEOUT = 120  # Seconds before an extraction process is killed
+FRAMED_EXTRACT_SLOT_WAIT = 2  # Seconds a request waits for a free extraction slot before falling back
+FRAMED_BUSY_FALLBACK_DRAWS = 5  # Movies drawn looking for an extracted pool while every slot is busy
+FRAMED_EXTRACT_BLACKLIST_SECONDS = 24 * 3600  # How long a file that hung or crashed the decoder is skipped
+
+# Framed pre-extraction
+FRAMED_PREFETCH_ENABLED = True
+FRAMED_PREFETCH_IDLE_SECONDS = 30  # Only extract after this long without a request
+FRAMED_PREFETCH_LOOKAHEAD = 5  # Upcoming Framed picks extracted before the rest of the library
+FRAMED_PREFETCH_MAX_READ_MBPS = 20  # Average video read rate allowed while pre-extracting
+FRAMED_PREFETCH_DISK_BUDGET_MB = 500  # Stop pre-extracting once the frame cache is this large
+FRAMED_PREFETCH_POLL_SECONDS = 5  # Re-check interval while waiting for the server to go idle
+FRAMED_PREFETCH_RESCAN_SECONDS = 300  # Re-check interval once caught up or over budget
 
 # Cast Match game settings
 CAST_MATCH_ROUNDS = 4
@@ -44,6 +122,7 @@ QUOTE_BLOCK_SIZE_MAX = 5
 QUOTE_MIN_LENGTH = 30
 QUOTE_MAX_LENGTH = 200
 QUOTE_MAX_TIME_GAP_SECONDS = 3  # Max seconds between consecutive lines in a block
+QUOTE_MAX_ATTEMPTS = 10  # Eligible movies tried per request before giving up
 
 # Name the Cast game settings
 NAME_THE_CAST_ROUNDS = 6
@@ -0,0 +1,323 @@
+"""Per-game sets of the library movies each game can be built from."""
+import os
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class EligibleSet:
+    """Movies that qualify for one game, with O(1) random choice and removal."""
+
+    __slots__ = ("_items", "_positions")
+
+    def __init__(self):
+        self._items = []
+        self._positions = {}
+
+    def add(self, movie):
+        if movie.rating_key not in self._positions:
+            self._positions[movie.rating_key] = len(self._items)
+            self._items.append(movie)
+
+    def discard(self, movie):
+        position = self._positions.pop(movie.rating_key, None)
+        if position is None:
+            return
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last.rating_key] = position
+
+    def choice(self):
+        return random.choice(self._items) if self._items else None
+
+    def get(self, rating_key):
+        position = self._positions.get(rating_key)
+        return self._items[position] if position is not None else None
+
+    def __contains__(self, movie):
+        return movie.rating_key in self._positions
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ShuffleBag:
+    """Draws the movies of an ``EligibleSet`` in shuffled order without repeats.
+
+    The permutation is built lazily, one Fisher-Yates step per draw, so a
+    draw is O(1) and a new cycle starts by resetting the cursor over a fresh
+    copy of the set. Movies rejected from the set since the cycle started
+    are skipped when the cursor reaches them.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.cycles = 0
+        self._items = list(pool)
+        self._cursor = 0
+        self._shuffled = 0
+        self._lock = threading.Lock()
+
+    def _settle(self, position):
+        """Fix the shuffled order up to and including ``position``."""
+        items = self._items
+        while self._shuffled <= position:
+            i = self._shuffled
+            j = random.randrange(i, len(items))
+            items[i], items[j] = items[j], items[i]
+            self._shuffled += 1
+
+    def _reshuffle(self):
+        self._items = list(self.pool)
+        self._cursor = 0
+        self._shuffled = 0
+        self.cycles += 1
+
+    def draw(self):
+        """Return the next movie, or None if the set is empty."""
+        with self._lock:
+            for _ in range(2):
+                while self._cursor < len(self._items):
+                    self._settle(self._cursor)
+                    movie = self._items[self._cursor]
+                    self._cursor += 1
+                    if movie in self.pool:
+                        return movie
+                self._reshuffle()
+            return None
+
+    def peek(self, count):
+        """Return up to ``count`` movies that the next draws will return, in order."""
+        with self._lock:
+            if self._cursor >= len(self._items):
+                self._reshuffle()
+            end = min(self._cursor + count, len(self._items))
+            if end > self._cursor:
+                self._settle(end - 1)
+            return [movie for movie in self._items[self._cursor:end] if movie in self.pool]
+
+
+class EligibilityIndex:
+    """Which movies qualify for each game, rebuilt with the library snapshot.
+
+    ``all`` holds every movie, ``year`` needs a release year, ``name_the_cast`` a TMDb id or at least
+    ``NAME_THE_CAST_MIN_ACTORS`` Plex actors, ``framed`` a readable video
+    file and ``quote`` a video file with ``.srt`` subtitles next to it.
+
+    The metadata sets are rebuilt inline when the snapshot changes. The
+    file-backed sets (``framed``, ``quote``) need every path resolved and
+    directory listed, so they are rebuilt on a background thread and swapped
+    in when done; until then the previous sets keep being served. Before the
+    first build finishes, those games draw from the whole library and check
+    each drawn movie's files on the spot.
+
+    A generator that still fails on a movie calls ``reject``. A transient
+    failure keeps the movie out of that game's set for
+    ``ELIGIBILITY_RETRY_SECONDS``; any other until its Plex record is updated.
+
+    Movies are handed out through one ``ShuffleBag`` per game, so a game
+    does not repeat a movie until it has used every eligible one.
+    """
+
+    GAMES = ("all", "year", "name_the_cast", "framed", "quote")
+    FILE_GAMES = ("framed", "quote")
+
+    def __init__(self, plex_service, paths):
+        self.plex = plex_service
+        self.paths = paths
+        self._pools = {game: EligibleSet() for game in self.GAMES}
+        self._bags = {game: ShuffleBag(pool) for game, pool in self._pools.items()}
+        self._cold_bags = {game: ShuffleBag(self._pools["all"]) for game in self.FILE_GAMES}
+        # (rating_key, updated_at) -> (retry time or None, movie) per game
+        self._rejected = {game: {} for game in self.GAMES}
+        self._next_retry = float("inf")
+        self._subtitle_dirs = {}
+        self._generation = None
+        self._files_ready = False
+        self._file_build = None
+        self._lock = threading.Lock()
+
+    def choice(self, game):
+        """Return the next eligible movie for ``game``, or None if there is none."""
+        self.pool(game)
+        if game in self.FILE_GAMES and not self._files_ready:
+            return self._cold_choice(game)
+        return self._bags[game].draw()
+
+    def upcoming(self, game, count):
+        """Return the movies the next ``count`` draws for ``game`` will return."""
+        self.pool(game)
+        if game in self.FILE_GAMES and not self._files_ready:
+            return self._cold_bags[game].peek(count)
+        return self._bags[game].peek(count)
+
+    def pool(self, game):
+        """Return the ``EligibleSet`` for ``game`` for the current library snapshot."""
+        movies = self.plex.get_movies()
+        generation = self.plex.generation
+        if self._generation != generation:
+            with self._lock:
+                if self._generation != generation:
+                    self._swap(self._build_metadata(movies))
+                    self._cold_bags = {name: ShuffleBag(self._pools["all"]) for name in self.FILE_GAMES}
+                    self._generation = generation
+                    self._start_file_build()
+        if time.time() >= self._next_retry:
+            self._retry_rejected()
+        return self._pools[game]
+
+    def reject(self, game, movie, transient=False):
+        """Exclude a movie from ``game`` after it failed to produce a round.
+
+        Pass ``transient`` when the failure may clear up on its own (a file
+        that could not be opened, TMDb unreachable) so the movie is retried
+        after ``ELIGIBILITY_RETRY_SECONDS``.
+        """
+        from .constants import ELIGIBILITY_RETRY_SECONDS
+
+        retry_at = time.time() + ELIGIBILITY_RETRY_SECONDS if transient else None
+        with self._lock:
+            self._rejected[game][(movie.rating_key, movie.updated_at)] = (retry_at, movie)
+            if retry_at is not None:
+                self._next_retry = min(self._next_retry, retry_at)
+            self._pools[game].discard(movie)
+
+    def stats(self):
+        return {game: len(pool) for game, pool in self._pools.items()}
+
+    def _swap(self, pools):
+        """Replace the given games' sets and bags. Call with the lock held."""
+        for game, pool in pools.items():
+            rejected = self._rejected[game]
+            if rejected:
+                for movie in list(pool):
+                    if (movie.rating_key, movie.updated_at) in rejected:
+                        pool.discard(movie)
+        self._bags = {**self._bags, **{game: ShuffleBag(pool) for game, pool in pools.items()}}
+        self._pools = {**self._pools, **pools}
+
+    def _retry_rejected(self):
+        """Put movies whose transient rejection has expired back into their sets."""
+        with self._lock:
+            now = time.time()
+            if now < self._next_retry:
+                return
+            self._next_retry = float("inf")
+            current = self._pools["all"]
+            for game, rejected in self._rejected.items():
+                for key, (retry_at, movie) in list(rejected.items()):
+                    if retry_at is None:
+                        continue
+                    if retry_at > now:
+                        self._next_retry = min(self._next_retry, retry_at)
+                        continue
+                    del rejected[key]
+                    record = current.get(movie.rating_key)
+                    if record is not None and record.updated_at == movie.updated_at:
+                        self._pools[game].add(record)
+
+    def _cold_choice(self, game):
+        """Draw a movie for a file-backed game before its set is built, checking its files on the spot."""
+        from .constants import ELIGIBILITY_COLD_DRAWS
+
+        bag = self._cold_bags[game]
+        rejected = self._rejected[game]
+        for _ in range(ELIGIBILITY_COLD_DRAWS):
+            movie = bag.draw()
+            if movie is None:
+                return None
+            if (movie.rating_key, movie.updated_at) in rejected:
+                continue
+            try:
+                video_path = self.paths.resolve(movie)
+            except Exception as e:
+                logger.error(f"Error resolving video file for {movie.title}: {e}")
+                video_path = None
+            if video_path and (game != "quote" or self._has_subtitles(video_path)):
+                return movie
+            self.reject(game, movie, transient=True)
+        return None
+
+    def _build_metadata(self, movies):
+        from .constants import NAME_THE_CAST_MIN_ACTORS
+
+        pools = {game: EligibleSet() for game in self.GAMES if game not in self.FILE_GAMES}
+        for movie in movies:
+            pools["all"].add(movie)
+            if movie.year:
+                pools["year"].add(movie)
+            if movie.tmdb_id or len(movie.actor_ids) >= NAME_THE_CAST_MIN_ACTORS:
+                pools["name_the_cast"].add(movie)
+        return pools
+
+    def _start_file_build(self):
+        """Rebuild the file-backed sets on a background thread unless one is running. Call with the lock held."""
+        if self._file_build is None:
+            self._file_build = threading.Thread(target=self._run_file_build, name="eligibility-files", daemon=True)
+            self._file_build.start()
+
+    def _run_file_build(self):
+        """Build the file-backed sets until they match the latest snapshot, then swap them in."""
+        while True:
+            movies = self.plex.get_movies()
+            generation = self.plex.generation
+            try:
+                pools = self._build_files(movies)
+            except Exception as e:
+                logger.error(f"Error building file-backed game eligibility: {e}")
+                pools = None
+            with self._lock:
+                if pools is None or self.plex.generation == generation:
+                    if pools is not None:
+                        self._swap(pools)
+                        self._files_ready = True
+                    self._file_build = None
+                    return
+
+    def _build_files(self, movies):
+        started = time.time()
+        # Warms the path cache, so the lookups below are dictionary hits
+        self.paths.resolve_library(movies)
+
+        pools = {game: EligibleSet() for game in self.FILE_GAMES}
+        for movie in movies:
+            try:
+                video_path = self.paths.resolve(movie)
+            except Exception:
+                video_path = None
+            if video_path:
+                pools["framed"].add(movie)
+                if self._has_subtitles(video_path):
+                    pools["quote"].add(movie)
+
+        logger.info(
+            f"Built file-backed game eligibility for {len(movies)} movies in {time.time() - started:.1f}s: "
+            f"{ {game: len(pool) for game, pool in pools.items()} }"
+        )
+        return pools
+
+    def _has_subtitles(self, video_path):
+        """Return True if the video's directory holds an ``.srt`` file, cached per directory mtime."""
+        video_dir = os.path.dirname(video_path)
+        try:
+            mtime = os.stat(video_dir).st_mtime
+        except OSError:
+            return False
+
+        cached = self._subtitle_dirs.get(video_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            has_subtitles = any(entry.name.endswith(".srt") for entry in os.scandir(video_dir))
+        except OSError:
+            has_subtitles = False
+        self._subtitle_dirs[video_dir] = (mtime, has_subtitles)
+        return has_subtitles
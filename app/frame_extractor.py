@@ -0,0 +1,405 @@
+"""Frame extraction for the Framed game."""
+import time
+import random
+import logging
+import threading
+import multiprocessing
+import cv2
+import numpy as np
+from .singleflight import FlightTimeout, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def pool_spans(start, end, count):
+    """Cut frames ``start``..``end`` into ``count`` equal spans, in order.
+
+    One pool frame is taken from each span, so a pool covers the whole movie
+    instead of clustering.
+    """
+    count = min(count, end - start)
+    if count <= 0:
+        return []
+    span = (end - start) / count
+    return [(start + int(i * span), start + int((i + 1) * span)) for i in range(count)]
+
+
+def trimmed_range(total_frames, fps):
+    """Return the frame range left after skipping the opening and closing minutes.
+
+    Videos too short to lose ``FRAMED_SKIP_START_SECONDS`` and
+    ``FRAMED_SKIP_END_SECONDS`` and still keep most of their runtime are
+    used whole.
+    """
+    from .constants import FRAMED_SKIP_END_SECONDS, FRAMED_SKIP_START_SECONDS
+
+    skip_start = int(FRAMED_SKIP_START_SECONDS * fps)
+    skip_end = int(FRAMED_SKIP_END_SECONDS * fps)
+    if fps <= 0 or (skip_start + skip_end) * 2 > total_frames:
+        return 0, total_frames
+    return skip_start, total_frames - skip_end
+
+
+def thumbnail(frame):
+    """Return a ``FRAME_RESIZE_WIDTH``-wide grayscale copy of a frame as float32."""
+    from .constants import FRAME_RESIZE_WIDTH
+
+    height, width = frame.shape[:2]
+    small_height = max(2, round(height * FRAME_RESIZE_WIDTH / width))
+    small = cv2.resize(frame, (FRAME_RESIZE_WIDTH, small_height), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+
+def frame_rejection(luma):
+    """Return why a frame would make a poor round, or None if it is usable.
+
+    ``luma`` is the frame's ``thumbnail``. Letterbox and pillarbox bars are
+    cropped off first, then the picture is rejected if it is black, too dark
+    or washed out, mostly dark with a little text (credits, logos), too flat,
+    or has too few edges to recognise anything.
+    """
+    from .constants import (
+        FRAMED_BAR_LUMA, FRAMED_EDGE_THRESHOLD, FRAMED_MAX_DARK_FRACTION, FRAMED_MAX_LUMA,
+        FRAMED_MIN_CONTRAST, FRAMED_MIN_EDGE_DENSITY, FRAMED_MIN_LUMA,
+    )
+
+    rows = np.flatnonzero(luma.mean(axis=1) > FRAMED_BAR_LUMA)
+    columns = np.flatnonzero(luma.mean(axis=0) > FRAMED_BAR_LUMA)
+    if rows.size < luma.shape[0] // 4 or columns.size < luma.shape[1] // 4:
+        return "black"
+    picture = luma[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1]
+
+    mean = picture.mean()
+    if mean < FRAMED_MIN_LUMA:
+        return "dark"
+    if mean > FRAMED_MAX_LUMA:
+        return "washed_out"
+    if (picture < FRAMED_MIN_LUMA).mean() > FRAMED_MAX_DARK_FRACTION:
+        return "mostly_dark"
+    if picture.std() < FRAMED_MIN_CONTRAST:
+        return "flat"
+
+    gradient = np.abs(np.diff(picture, axis=1))[:-1] + np.abs(np.diff(picture, axis=0))[:, :-1]
+    if (gradient > FRAMED_EDGE_THRESHOLD).mean() < FRAMED_MIN_EDGE_DENSITY:
+        return "featureless"
+    return None
+
+
+def dhash(luma):
+    """Return the 64-bit difference hash of a frame's ``thumbnail``."""
+    small = cv2.resize(luma, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming_distances(hashes, value):
+    """Return the Hamming distance from ``value`` to every hash in the ``hashes`` array."""
+    diff = hashes ^ np.uint64(value)
+    return np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class FrameReader:
+    """Reads frames at increasing positions from an open ``cv2.VideoCapture``.
+
+    Every seek in OpenCV's FFmpeg backend goes back to the previous
+    keyframe and decodes forward to the exact frame. In fast mode a target
+    within ``FRAMED_SEQUENTIAL_READ_SECONDS`` of the decoder's current
+    position is instead reached by ``grab()``-ing the frames in between,
+    which decodes them without converting them to images; in practice that
+    is the retries within a span. Longer jumps, and every target without
+    fast mode, are frame seeks.
+    """
+
+    def __init__(self, cap, fps, fast=True):
+        from .constants import FRAMED_SEQUENTIAL_READ_SECONDS
+
+        self.cap = cap
+        self.fps = fps
+        self.fast = fast and fps > 0
+        self.max_grab = int(FRAMED_SEQUENTIAL_READ_SECONDS * fps) if self.fast else 0
+        self.next_frame = None
+        self.seeks = 0
+        self.grabs = 0
+
+    def read(self, target):
+        """Return ``(frame_number, image)`` for the frame at ``target``, or None."""
+        gap = None if self.next_frame is None else target - self.next_frame
+        if gap is not None and 0 <= gap <= self.max_grab:
+            for _ in range(gap):
+                if not self.cap.grab():
+                    self.next_frame = None
+                    return None
+            self.grabs += gap
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            self.seeks += 1
+
+        ret, frame = self.cap.read()
+        if not ret or frame is None:
+            self.next_frame = None
+            return None
+        self.next_frame = target + 1
+        return target, frame
+
+
+def extract_frame_pool(video_path, count, cache_dir, cache_key, existing=()):
+    """Decode up to ``count`` frames in one forward pass and save them as JPEGs.
+
+    Each span of the trimmed runtime contributes one frame; a frame that
+    ``frame_rejection`` turns down, or whose dHash is within
+    ``FRAMED_DUPLICATE_DISTANCE`` bits of a frame already in the pool, is
+    replaced by one a few seconds later in the same span, up to
+    ``FRAMED_FRAME_ATTEMPTS`` tries. ``existing`` holds the frame entries of
+    a pool being topped up; their stored hashes join the duplicate check.
+
+    Returns the new frame entries, each with its frame number, timestamp,
+    hash and file name inside ``cache_dir``, and timings for the extraction.
+    """
+    from .constants import (
+        FRAMED_DUPLICATE_DISTANCE, FRAMED_FAST_SEEK, FRAMED_FRAME_ATTEMPTS, FRAMED_FRAME_HEIGHT,
+        FRAMED_FRAME_RETRY_SECONDS, FRAMED_FRAME_WIDTH,
+    )
+    from .utils import safe_video_capture
+
+    started = time.time()
+    frames = []
+    rejected = {}
+    taken = {frame["frame_number"] for frame in existing}
+    known = [int(frame["hash"], 16) for frame in existing if frame.get("hash")]
+    hashes = np.zeros(len(known) + count, dtype=np.uint64)
+    hashes[:len(known)] = known
+    hash_count = len(known)
+    with safe_video_capture(video_path) as cap:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        reader = FrameReader(cap, fps, FRAMED_FAST_SEEK)
+        retry_step = max(1, int(FRAMED_FRAME_RETRY_SECONDS * fps))
+        for span_start, span_end in pool_spans(*trimmed_range(total_frames, fps), count):
+            target = span_start + random.randrange(span_end - span_start)
+            for _ in range(FRAMED_FRAME_ATTEMPTS):
+                if target >= span_end:
+                    break
+                result = reader.read(target)
+                if result is None:
+                    break
+                frame_pos, frame = result
+                target = max(frame_pos, target) + retry_step
+                if frame_pos in taken:
+                    # Topping up a pool: this frame is already in it
+                    continue
+
+                # Score a thumbnail first so rejected frames are never resized or encoded
+                luma = thumbnail(frame)
+                reason = frame_rejection(luma)
+                frame_hash = dhash(luma)
+                if reason is None and hash_count and (
+                    hamming_distances(hashes[:hash_count], frame_hash).min() <= FRAMED_DUPLICATE_DISTANCE
+                ):
+                    reason = "duplicate"
+                if reason is not None:
+                    rejected[reason] = rejected.get(reason, 0) + 1
+                    continue
+
+                resized = cv2.resize(frame, (FRAMED_FRAME_WIDTH, FRAMED_FRAME_HEIGHT))
+                frame_filename = f"{cache_key}_frame_{frame_pos}.jpg"
+                frame_path = cache_dir / frame_filename
+                if not cv2.imwrite(str(frame_path), resized, [cv2.IMWRITE_JPEG_QUALITY, 85]):
+                    logger.error(f"Failed to save frame to: {frame_path}")
+                    break
+
+                hashes[hash_count] = frame_hash
+                hash_count += 1
+                frames.append({
+                    "frame_number": frame_pos,
+                    "time": frame_pos / fps if fps > 0 else 0,
+                    "hash": f"{frame_hash:016x}",
+                    "filename": frame_filename,
+                })
+                break
+
+    extraction = {
+        "mode": "fast" if reader.fast else "exact",
+        "seconds": round(time.time() - started, 2),
+        "seeks": reader.seeks,
+        "grabs": reader.grabs,
+        "rejected": rejected,
+    }
+    logger.info(
+        f"Extracted {len(frames)} frames from {video_path} in {extraction['seconds']}s "
+        f"({extraction['mode']} mode: {reader.seeks} seeks, {reader.grabs} grabbed frames; rejected {rejected})"
+    )
+    return {"frames": frames, "extraction": extraction}
+
+
+class FrameExtractionBusy(Exception):
+    """Raised when no extraction slot frees up, or another caller's job for the file does not finish, in time."""
+
+
+def _bytes_read():
+    """Return the bytes this process has read so far, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _extraction_job(conn, video_path, count, cache_dir, cache_key, existing):
+    """Run ``extract_frame_pool`` in a child process and send back the result."""
+    try:
+        read_before = _bytes_read()
+        pool = extract_frame_pool(video_path, count, cache_dir, cache_key, existing)
+        read_after = _bytes_read()
+        if read_before is not None and read_after is not None:
+            pool["extraction"]["read_bytes"] = read_after - read_before
+        conn.send(("ok", pool))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+class FrameExtractionPool:
+    """Runs frame extractions in child processes with a hard deadline.
+
+    Each job gets its own spawned process, so a decoder that hangs or
+    crashes on a bad file takes down only that process and never holds the
+    GIL of the web server. At most ``FRAMED_EXTRACT_WORKERS`` jobs run at
+    once; a caller waits at most ``FRAMED_EXTRACT_SLOT_WAIT`` seconds for a
+    free slot, so a request never queues behind a running job. A job still running after ``FRAMED_EXTRACT_TIMEOUT`` seconds is
+    killed, its partial frames are removed, and the file is blacklisted
+    for ``FRAMED_EXTRACT_BLACKLIST_SECONDS``. Concurrent requests for the
+    same file share one job.
+    """
+
+    def __init__(self, workers=None, timeout=None):
+        from .constants import FRAMED_EXTRACT_TIMEOUT, FRAMED_EXTRACT_WORKERS
+
+        self.workers = workers or FRAMED_EXTRACT_WORKERS
+        self.timeout = timeout or FRAMED_EXTRACT_TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._single_flight = SingleFlight()
+        self._blacklist = {}
+        self._lock = threading.Lock()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.busy = 0
+
+    def is_blacklisted(self, cache_key):
+        with self._lock:
+            expires = self._blacklist.get(cache_key)
+            if expires is not None and expires <= time.time():
+                del self._blacklist[cache_key]
+                expires = None
+        return expires is not None
+
+    def _blacklist_key(self, cache_key):
+        from .constants import FRAMED_EXTRACT_BLACKLIST_SECONDS
+
+        with self._lock:
+            self._blacklist[cache_key] = time.time() + FRAMED_EXTRACT_BLACKLIST_SECONDS
+
+    def extract(self, video_path, count, cache_dir, cache_key, existing=(), wait=None):
+        """Return the new frames and extraction stats for a video, or None if extraction failed.
+
+        ``existing`` is passed through to ``extract_frame_pool`` when topping
+        up a pool. ``wait`` is how long to wait for a free slot, or for a job
+        another caller already started on the same file, by default
+        ``FRAMED_EXTRACT_SLOT_WAIT``; background callers pass 0.
+
+        Raises ``FrameExtractionBusy`` if neither happens within ``wait``.
+        """
+        from .constants import FRAMED_EXTRACT_SLOT_WAIT
+
+        if self.is_blacklisted(cache_key):
+            logger.info(f"Skipping frame extraction for blacklisted file {video_path}")
+            return None
+        if wait is None:
+            wait = FRAMED_EXTRACT_SLOT_WAIT
+        try:
+            return self._single_flight.do(
+                cache_key, lambda: self._run(video_path, count, cache_dir, cache_key, list(existing), wait), wait
+            )
+        except FlightTimeout:
+            self.busy += 1
+            raise FrameExtractionBusy(f"Frame extraction for {video_path} is already running") from None
+
+    def _run(self, video_path, count, cache_dir, cache_key, existing, wait):
+        if not self._slots.acquire(timeout=wait):
+            self.busy += 1
+            raise FrameExtractionBusy(f"No frame extraction slot free for {video_path}")
+        try:
+            with self._lock:
+                self.running += 1
+            return self._run_process(video_path, count, cache_dir, cache_key, existing)
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def _run_process(self, video_path, count, cache_dir, cache_key, existing):
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_extraction_job,
+            args=(sender, video_path, count, cache_dir, cache_key, existing),
+            name=f"frame-extract-{cache_key[:8]}",
+            daemon=True,
+        )
+        process.start()
+        # Only the child holds the sending end now, so its exit shows up as EOF
+        sender.close()
+
+        try:
+            if receiver.poll(self.timeout):
+                status, result = receiver.recv()
+            else:
+                status, result = "timeout", None
+        except EOFError:
+            status, result = "crashed", None
+        finally:
+            receiver.close()
+
+        if status == "timeout":
+            process.kill()
+        process.join()
+
+        if status == "ok":
+            self.completed += 1
+            return result
+
+        self.failed += 1
+        if status == "error":
+            logger.error(f"Frame extraction failed for {video_path}: {result}")
+        elif status == "timeout":
+            self.timed_out += 1
+            logger.error(f"Frame extraction for {video_path} exceeded {self.timeout}s; killed and blacklisted")
+            self._blacklist_key(cache_key)
+        else:
+            logger.error(f"Frame extraction process for {video_path} died (exit code {process.exitcode}); blacklisted")
+            self._blacklist_key(cache_key)
+        # The index is written by the caller, so new frames were never served
+        served = {frame["filename"] for frame in existing}
+        for partial in cache_dir.glob(f"{cache_key}_frame_*.jpg"):
+            if partial.name not in served:
+                partial.unlink(missing_ok=True)
+        return None
+
+    def stats(self):
+        with self._lock:
+            blacklisted = sum(1 for expires in self._blacklist.values() if expires > time.time())
+        return {
+            "workers": self.workers,
+            "timeout_seconds": self.timeout,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "busy": self.busy,
+            "blacklisted": blacklisted,
+        }
@@ -0,0 +1,164 @@
+"""Background job that extracts Framed frame pools while the server is idle."""
+import time
+import logging
+import threading
+from collections import deque
+from .frame_extractor import FrameExtractionBusy
+
+logger = logging.getLogger(__name__)
+
+
+class FramedPrefetcher:
+    """Extracts frame pools for library movies before anyone plays them.
+
+    Works only after no request has been served for
+    ``FRAMED_PREFETCH_IDLE_SECONDS`` and while no other extraction is
+    running. Movies the Framed shuffle bag will hand out next come first,
+    then the rest of the eligible library. After each extraction the job
+    sleeps long enough to keep its average read rate under
+    ``FRAMED_PREFETCH_MAX_READ_MBPS``, so it does not starve Plex streams
+    reading from the same disk, and it stops adding pools once the frame
+    cache holds ``FRAMED_PREFETCH_DISK_BUDGET_MB``.
+    """
+
+    def __init__(self, trivia, load):
+        self.trivia = trivia
+        self.load = load
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+        self._queue = deque()
+        self._done = set()
+        self.state = "idle"
+        self.current = None
+        self.extracted = 0
+        self.already_cached = 0
+        self.failed = 0
+        self.bytes_read = 0
+        self.throttled_seconds = 0.0
+        self.last_extraction = None
+
+    def start(self):
+        """Start the background thread."""
+        from .constants import FRAMED_PREFETCH_ENABLED
+
+        if self._thread is not None or not FRAMED_PREFETCH_ENABLED:
+            return
+        self._thread = threading.Thread(target=self._run, name="framed-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        from .constants import FRAMED_PREFETCH_RESCAN_SECONDS
+
+        while not self._stop.is_set():
+            try:
+                wait = self._step()
+            except Exception as e:
+                logger.error(f"Framed prefetch failed: {e}")
+                self.state = "error"
+                wait = FRAMED_PREFETCH_RESCAN_SECONDS
+            self.current = None
+            if wait:
+                self._stop.wait(wait)
+
+    def _step(self):
+        """Extract at most one pool. Returns how long to wait before the next step."""
+        from .constants import (
+            FRAMED_PREFETCH_DISK_BUDGET_MB, FRAMED_PREFETCH_IDLE_SECONDS, FRAMED_PREFETCH_POLL_SECONDS,
+            FRAMED_PREFETCH_RESCAN_SECONDS,
+        )
+
+        if self.load.idle_for() < FRAMED_PREFETCH_IDLE_SECONDS or self.trivia.frame_extractor.running:
+            self.state = "waiting_for_idle"
+            return FRAMED_PREFETCH_POLL_SECONDS
+        if self.trivia.framed_store.usage()["bytes"] >= FRAMED_PREFETCH_DISK_BUDGET_MB * 1024 * 1024:
+            self.state = "disk_budget_reached"
+            return FRAMED_PREFETCH_RESCAN_SECONDS
+
+        movie = self._next_movie()
+        if movie is None:
+            self.state = "caught_up"
+            return FRAMED_PREFETCH_RESCAN_SECONDS
+
+        self.state = "extracting"
+        self.current = movie.title
+        started = time.time()
+        try:
+            extraction = self.trivia.warm_framed_pool(movie, wait=0)
+        except FrameExtractionBusy:
+            self._queue.appendleft(movie)
+            return FRAMED_PREFETCH_POLL_SECONDS
+        self._done.add((movie.rating_key, movie.updated_at))
+
+        if extraction is None:
+            self.failed += 1
+            return 0
+        if not extraction:
+            self.already_cached += 1
+            return 0
+
+        self.extracted += 1
+        self.last_extraction = {"title": movie.title, **extraction}
+        return self._throttle(extraction, time.time() - started)
+
+    def _throttle(self, extraction, elapsed):
+        """Return the pause that keeps the average read rate under the cap."""
+        from .constants import FRAMED_PREFETCH_MAX_READ_MBPS
+
+        read_bytes = extraction.get("read_bytes")
+        if read_bytes is None:
+            # Without read counters, spend as long resting as extracting
+            pause = elapsed
+        else:
+            self.bytes_read += read_bytes
+            pause = max(0.0, read_bytes / (FRAMED_PREFETCH_MAX_READ_MBPS * 1024 * 1024) - elapsed)
+        self.throttled_seconds += pause
+        return pause
+
+    def _next_movie(self):
+        """Return the next movie whose pool has not been handled, preferring upcoming picks."""
+        from .constants import FRAMED_PREFETCH_LOOKAHEAD
+
+        eligibility = self.trivia.eligibility
+        pool = eligibility.pool("framed")
+        if pool is not self._pool:
+            # New library snapshot: queue every eligible movie again
+            self._pool = pool
+            self._queue = deque(pool)
+
+        for movie in eligibility.upcoming("framed", FRAMED_PREFETCH_LOOKAHEAD):
+            if (movie.rating_key, movie.updated_at) not in self._done:
+                return movie
+
+        while self._queue:
+            movie = self._queue.popleft()
+            if movie in pool and (movie.rating_key, movie.updated_at) not in self._done:
+                return movie
+        return None
+
+    def status(self):
+        from .constants import FRAMED_PREFETCH_DISK_BUDGET_MB, FRAMED_PREFETCH_LOOKAHEAD, FRAMED_PREFETCH_MAX_READ_MBPS
+
+        upcoming = [
+            movie.title
+            for movie in self.trivia.eligibility.upcoming("framed", FRAMED_PREFETCH_LOOKAHEAD)
+            if (movie.rating_key, movie.updated_at) not in self._done
+        ]
+        return {
+            "state": self.state,
+            "current": self.current,
+            "upcoming": upcoming,
+            "queued": len(self._queue),
+            "extracted": self.extracted,
+            "already_cached": self.already_cached,
+            "failed": self.failed,
+            "bytes_read": self.bytes_read,
+            "throttled_seconds": round(self.throttled_seconds, 1),
+            "max_read_mbps": FRAMED_PREFETCH_MAX_READ_MBPS,
+            "disk_budget_mb": FRAMED_PREFETCH_DISK_BUDGET_MB,
+            "cache_mb": round(self.trivia.framed_store.usage()["bytes"] / (1024 * 1024), 2),
+            "last_extraction": self.last_extraction,
+        }
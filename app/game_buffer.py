@@ -0,0 +1,152 @@
+"""Ready-made game payloads kept topped up by background producers."""
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class LoadMonitor:
+    """Counts requests currently being served and when the last one finished."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.last_active = time.time()
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.last_active = time.time()
+
+    def exit(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.last_active = time.time()
+
+    def idle_for(self):
+        """Return how many seconds no request has been in flight, or 0 while one is."""
+        if self.in_flight > 0:
+            return 0
+        return time.time() - self.last_active
+
+
+class GameBuffer:
+    """Per-game queues of pre-generated payloads.
+
+    One producer thread per game fills its queue to ``GAME_BUFFER_DEPTHS``
+    entries by calling the game's generator, so ``take`` can usually hand
+    out a finished game without doing any work. When the queue is empty,
+    ``take`` generates synchronously as before. A producer starts filling
+    only after its game's first ``take`` and then only replaces payloads
+    that were taken, so an idle server builds nothing, and producers pause while more than ``GAME_BUFFER_MAX_ACTIVE_REQUESTS`` requests
+    are in flight. Per game, ``producers`` can replace the generator used in
+    the background (e.g. one that never starts expensive work), ``ready``
+    must pass before the producer builds a payload, and ``valid`` must pass
+    before a buffered payload is handed out. Payloads built from an older
+    library snapshot are dropped.
+    """
+
+    def __init__(self, generators, load=None, generation=None, producers=None, ready=None, valid=None):
+        from .constants import GAME_BUFFER_DEPTHS
+
+        self.generators = generators
+        self.load = load or LoadMonitor()
+        self.generation = generation or (lambda: None)
+        self.producers = producers or {}
+        self.ready = ready or {}
+        self.valid = valid or {}
+        self.depths = {name: GAME_BUFFER_DEPTHS.get(name, 0) for name in generators}
+        self._queues = {name: deque() for name in generators}
+        self._wakeups = {name: threading.Event() for name in generators}
+        self._stop = threading.Event()
+        self._threads = []
+        self.hits = {name: 0 for name in generators}
+        self.misses = {name: 0 for name in generators}
+
+    def start(self):
+        """Start one producer thread for each game with a non-zero depth."""
+        if self._threads:
+            return
+        for name, depth in self.depths.items():
+            if depth <= 0:
+                continue
+            thread = threading.Thread(
+                target=self._produce_loop, args=(name,), name=f"game-buffer-{name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+
+    def take(self, name):
+        """Return a buffered payload for ``name``, or generate one now."""
+        payload = self._pop_fresh(name)
+        self._wakeups[name].set()
+        if payload is not None:
+            self.hits[name] += 1
+            return payload
+        self.misses[name] += 1
+        return self.generators[name]()
+
+    def _pop_fresh(self, name):
+        queue = self._queues[name]
+        valid = self.valid.get(name)
+        while True:
+            try:
+                generation, payload = queue.popleft()
+            except IndexError:
+                return None
+            if generation == self.generation() and (valid is None or valid(payload)):
+                return payload
+
+    def _produce_loop(self, name):
+        from .constants import GAME_BUFFER_MAX_ACTIVE_REQUESTS, GAME_BUFFER_RETRY_SECONDS
+
+        queue = self._queues[name]
+        wakeup = self._wakeups[name]
+        generate = self.producers.get(name, self.generators[name])
+        ready = self.ready.get(name)
+        depth = self.depths[name]
+
+        # Nothing is built for a game nobody has played yet
+        wakeup.wait()
+        wakeup.clear()
+
+        while not self._stop.is_set():
+            if len(queue) >= depth:
+                # Sleep until a payload is taken
+                wakeup.wait()
+                wakeup.clear()
+                continue
+
+            if self.load.in_flight > GAME_BUFFER_MAX_ACTIVE_REQUESTS or (ready is not None and not ready()):
+                self._stop.wait(1 if ready is None else GAME_BUFFER_RETRY_SECONDS)
+                continue
+
+            generation = self.generation()
+            try:
+                payload = generate()
+            except Exception as e:
+                logger.error(f"Game buffer producer for {name} failed: {e}")
+                payload = None
+
+            if not payload or (isinstance(payload, dict) and "error" in payload):
+                self._stop.wait(GAME_BUFFER_RETRY_SECONDS)
+                continue
+            queue.append((generation, payload))
+
+    def stats(self):
+        return {
+            name: {
+                "ready": len(self._queues[name]),
+                "depth": self.depths[name],
+                "hits": self.hits[name],
+                "misses": self.misses[name],
+            }
+            for name in self.generators
+        }
@@ -0,0 +1,147 @@
+"""Process-wide snapshot of Plex library sections with background delta refresh."""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LibrarySnapshot:
+    """In-memory copy of one Plex library section.
+
+    The section is fetched in full once, then kept current by a background
+    thread that only asks Plex for items updated since the last sync. Pages
+    are streamed from ``PlexService.iter_section`` and each listing element
+    is converted with ``build_record`` as it arrives, so only the compact
+    records from ``app.catalog`` are kept. Every change bumps ``generation``
+    so derived indexes know when to rebuild; indexes that every reader needs
+    can instead be passed as ``build_index`` and are rebuilt with each
+    published snapshot.
+    """
+
+    def __init__(self, plex_service, section_name, build_record, build_index=None, refresh_interval=None):
+        from .constants import LIBRARY_REFRESH_INTERVAL
+
+        self.plex = plex_service
+        self.section_name = section_name
+        self.build_record = build_record
+        self.build_index = build_index
+        self.index = build_index([]) if build_index else None
+        self.refresh_interval = LIBRARY_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.generation = 0
+        self._items_by_key = {}
+        self._items = []
+        self._watermark = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def items(self):
+        """Return the current list of records, loading the section on first use."""
+        if not self._loaded:
+            self._ensure_loaded()
+        return self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                self._full_load()
+                self._loaded = True
+            except Exception as e:
+                logger.error(f"Failed to load Plex section '{self.section_name}': {e}")
+                return
+
+        self._start_refresher()
+
+    def _full_load(self):
+        """Stream the whole section and replace the snapshot."""
+        items_by_key = {}
+        for item in self.plex.iter_section(self.section_name, self.build_record):
+            items_by_key[item.rating_key] = item
+        self._items_by_key = items_by_key
+        self._watermark = self._max_updated_at(items_by_key.values())
+        self._publish()
+        logger.info(f"Loaded {len(self._items)} items from Plex section '{self.section_name}'")
+
+    def refresh(self):
+        """Merge items added or updated since the last sync into the snapshot.
+
+        Removals never show up in an ``updatedAt`` query, so when the merged
+        snapshot no longer matches the section's total size a full reload is
+        done instead.
+        """
+        if not self.plex.server:
+            return False
+
+        with self._lock:
+            if not self._loaded:
+                return False
+            try:
+                changed = []
+                if self._watermark is not None:
+                    # Plex compares at one-second resolution, so step back a
+                    # second and let the ratingKey merge drop duplicates.
+                    since = int(self._watermark) - 1
+                    updated = self.plex.iter_section(
+                        self.section_name, self.build_record, filters={"updatedAt>>": since}
+                    )
+                    changed = [item for item in updated if self._is_newer(item)]
+
+                for item in changed:
+                    self._items_by_key[item.rating_key] = item
+
+                if len(self._items_by_key) != self.plex.section_size(self.section_name):
+                    logger.info(f"Plex section '{self.section_name}' size changed, doing a full reload")
+                    self._full_load()
+                    return True
+
+                if not changed:
+                    return False
+
+                self._watermark = max(self._watermark or 0, self._max_updated_at(changed) or 0)
+                self._publish()
+                logger.info(f"Merged {len(changed)} updated items into Plex section '{self.section_name}'")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to refresh Plex section '{self.section_name}': {e}")
+                return False
+
+    def _publish(self):
+        # Readers hold a reference to the old list, so swap rather than mutate
+        items = list(self._items_by_key.values())
+        if self.build_index:
+            self.index = self.build_index(items)
+        self._items = items
+        self.generation += 1
+
+    def _is_newer(self, item):
+        current = self._items_by_key.get(item.rating_key)
+        return current is None or item.updated_at != current.updated_at
+
+    @staticmethod
+    def _max_updated_at(items):
+        stamps = [item.updated_at for item in items if item.updated_at is not None]
+        return max(stamps) if stamps else None
+
+    def _start_refresher(self):
+        if self._thread is not None or self.refresh_interval <= 0:
+            return
+        self._thread = threading.Thread(
+            target=self._refresh_loop,
+            name=f"library-refresh-{self.section_name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop.set()
@@ -0,0 +1,190 @@
+"""Resolve Plex media part paths to paths readable from this host."""
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Common Docker/NAS mount patterns
+COMMON_MOUNTS = [
+    "/data/media",
+    "/media",
+    "/mnt/media",
+    "/volume1/media",  # Synology
+    "/shares/media",   # Generic NAS
+    "/mnt/user/media", # Unraid
+]
+
+# Windows network shares to try when MEDIA_PATH is not a Windows path
+WINDOWS_FALLBACK_SHARES = [
+    "\\\\TOWER\\data\\media",
+    "\\\\NAS\\data\\media",
+    "\\\\SERVER\\media",
+    "\\\\UNRAID\\data\\media",
+]
+
+
+class PathRule:
+    """A prefix rewrite from a Plex path to a local path."""
+
+    __slots__ = ("source", "target", "sep")
+
+    def __init__(self, source, target, sep="/"):
+        self.source = source
+        self.target = target
+        self.sep = sep
+
+    def matches(self, path):
+        return path.startswith(self.source)
+
+    def apply(self, path):
+        if not self.source and not self.target:
+            return path
+        relative_path = path[len(self.source):].lstrip('/')
+        if self.sep != '/':
+            relative_path = relative_path.replace('/', self.sep)
+        if self.sep == '/' and not self.target.startswith('/'):
+            return os.path.join(self.target, relative_path)
+        if self.target.endswith(self.sep):
+            return self.target + relative_path
+        return self.target + self.sep + relative_path
+
+    def __eq__(self, other):
+        return isinstance(other, PathRule) and (self.source, self.target, self.sep) == (other.source, other.target, other.sep)
+
+    def __hash__(self):
+        return hash((self.source, self.target, self.sep))
+
+    def __repr__(self):
+        return f"PathRule({self.source!r} -> {self.target!r})"
+
+
+IDENTITY_RULE = PathRule("", "")
+
+
+class PathResolver:
+    """Maps Plex part paths to local files, learning which rewrite works.
+
+    The first successful rewrite (for example ``/data/media`` to
+    ``MEDIA_PATH``) is remembered and tried first for every later part, so a
+    warm resolver stats a single candidate. Results are cached per media
+    part and invalidated when the movie's ``updated_at`` or the part size
+    changes; misses are cached for ``PATH_RESOLVER_MISS_TTL`` seconds.
+    """
+
+    def __init__(self, media_path=None):
+        self.media_path = media_path or os.getenv("MEDIA_PATH", "/data/media")
+        self._learned = []
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, movie):
+        """Return a readable video file path for a movie record, or None."""
+        for part in movie.parts:
+            path = self.resolve_part(part, movie.updated_at)
+            if path:
+                return path
+        return None
+
+    def resolve_part(self, part, updated_at=None):
+        """Return a readable path for one media part, using the cache when valid."""
+        from .constants import PATH_RESOLVER_MISS_TTL
+
+        cache_key = part.id if part.id is not None else part.file
+        version = (updated_at, part.size)
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            path, resolved_at = cached[1], cached[2]
+            if path or time.time() - resolved_at < PATH_RESOLVER_MISS_TTL:
+                return path
+
+        path = self._resolve_path(part.file)
+        self._cache[cache_key] = (version, path, time.time())
+        return path
+
+    def invalidate(self, movie):
+        """Forget cached paths for a movie, e.g. after the file failed to open."""
+        for part in movie.parts:
+            self._cache.pop(part.id if part.id is not None else part.file, None)
+
+    def resolve_library(self, movies):
+        """Resolve every movie's parts, warming the cache. Returns the hit count."""
+        started = time.time()
+        found = 0
+        for movie in movies:
+            try:
+                if self.resolve(movie):
+                    found += 1
+            except Exception as e:
+                logger.error(f"Error resolving video file for {movie.title}: {e}")
+        logger.info(
+            f"Resolved video files for {found}/{len(movies)} movies in {time.time() - started:.1f}s "
+            f"(rules: {self._learned})"
+        )
+        return found
+
+    def _resolve_path(self, file_path):
+        # Learned rules first; a warm resolver only ever stats this one path
+        for rule in self._learned:
+            if rule.matches(file_path):
+                candidate = rule.apply(file_path)
+                if os.path.exists(candidate):
+                    return candidate
+                break
+
+        for rule in self.candidate_rules(file_path):
+            candidate = rule.apply(file_path)
+            logger.debug(f"Checking: {candidate}")
+            if os.path.exists(candidate):
+                self._learn(rule)
+                return candidate
+
+        logger.debug(f"No valid file path found for {file_path}")
+        return None
+
+    def _learn(self, rule):
+        with self._lock:
+            if rule in self._learned:
+                self._learned.remove(rule)
+            else:
+                logger.info(f"Learned media path mapping {rule}")
+            self._learned.insert(0, rule)
+
+    def candidate_rules(self, original_path):
+        """Return the rewrite rules to try for a path, original path first."""
+        rules = [IDENTITY_RULE]
+        media_path = self.media_path
+        windows_media_path = media_path.startswith('\\\\') or (len(media_path) > 1 and media_path[1] == ':')
+
+        # Windows development scenario - convert Unix paths to Windows network shares
+        if os.name == 'nt':
+            shares = [media_path] if windows_media_path else WINDOWS_FALLBACK_SHARES
+            for share in shares:
+                for mount in COMMON_MOUNTS:
+                    if original_path.startswith(mount):
+                        rules.append(PathRule(mount, share, '\\'))
+                        break  # Only need one Windows mapping per mount
+
+        # Unix/Linux path mappings (for production on NAS or when not Windows)
+        if os.name != 'nt' or not windows_media_path:
+            # Replace any common mount prefix with our configured media path
+            for mount in COMMON_MOUNTS:
+                if original_path.startswith(mount):
+                    rules.append(PathRule(mount, media_path))
+
+            if original_path.startswith("/data/"):
+                # Map /data/xxx to /mnt/user/xxx (Unraid style)
+                rules.append(PathRule("/data/", "/mnt/user/"))
+                # Map /data/xxx to configured media path
+                if media_path != "/data":
+                    rules.append(PathRule("/data/", media_path))
+
+        # Remove duplicates while preserving order
+        seen = set()
+        unique_rules = []
+        for rule in rules:
+            if rule not in seen:
+                seen.add(rule)
+                unique_rules.append(rule)
+        return unique_rules
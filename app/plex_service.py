@@ -1,6 +1,12 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from plexapi import utils as plex_utils
 from plexapi.server import PlexServer
-from plexapi.video import Show, Movie
+from requests import Session
+from requests.adapters import HTTPAdapter
 import logging
+from .catalog import MovieCatalog, MovieRecord, ShowRecord, TMDbIndex
+from .library import LibrarySnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -9,24 +15,110 @@ class PlexService:
     """Wrapper around the Plex API for retrieving media."""
 
     def __init__(self, base_url: str | None, token: str | None):
+        from .constants import PLEX_PAGE_WORKERS
+
         self.base_url = base_url
         self.token = token
         self.server = None
         if base_url and token:
             try:
-                self.server = PlexServer(base_url, token)
+                # Share one connection pool sized for the concurrent page fetches
+                session = Session()
+                adapter = HTTPAdapter(pool_connections=PLEX_PAGE_WORKERS, pool_maxsize=PLEX_PAGE_WORKERS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.server = PlexServer(base_url, token, session=session)
             except Exception as e:
                 # Fail silently; the routes will handle missing connection
                 logger.error(f"Failed to connect to Plex: {e}")
                 self.server = None
 
-    def get_movies(self) -> list[Movie]:
+        self.catalog = MovieCatalog()
+        self.movie_library = LibrarySnapshot(
+            self, "Movies", self.catalog.record_from_element, build_index=TMDbIndex
+        )
+        self.show_library = LibrarySnapshot(self, "TV Shows", ShowRecord.from_element)
+
+    @property
+    def generation(self) -> int:
+        """Counter that changes whenever the movie snapshot changes."""
+        return self.movie_library.generation
+
+    def get_movies(self) -> list[MovieRecord]:
         if not self.server:
             return []
+        return self.movie_library.items()
 
-        return self.server.library.section("Movies").all()
-
-    def get_shows(self) -> list[Show]:
+    def get_shows(self) -> list[ShowRecord]:
         if not self.server:
             return []
-        return self.server.library.section("TV Shows").all()
+        return self.show_library.items()
+
+    def get_tmdb_index(self) -> TMDbIndex:
+        """Return the rating key/TMDb id index for the current movie snapshot."""
+        self.get_movies()
+        return self.movie_library.index
+
+    def get_actors(self, movie: MovieRecord) -> list[str]:
+        """Return actor names for a movie record in billing order."""
+        return self.catalog.actors_of(movie)
+
+    def get_thumb_url(self, movie: MovieRecord) -> str | None:
+        """Build an authenticated poster URL for a movie record."""
+        if not self.server or not movie.thumb:
+            return None
+        try:
+            return self.server.url(movie.thumb, includeToken=True)
+        except Exception:
+            return None
+
+    def section_size(self, section_name: str) -> int:
+        """Return the number of items Plex reports for a library section."""
+        key = self._section_key(section_name)
+        data = self._query_page(key, {}, 0, 0)
+        return int(data.attrib.get("totalSize", 0))
+
+    def iter_section(self, section_name: str, build_record, filters: dict | None = None):
+        """Stream records for a library section, fetching pages concurrently.
+
+        The listing is requested in ``PLEX_PAGE_SIZE`` pages with guids
+        included, and each ``Video``/``Directory`` element is handed to
+        ``build_record`` as soon as its page arrives. At most
+        ``2 * PLEX_PAGE_WORKERS`` pages are held in memory at once, and
+        records are yielded in library order.
+        """
+        from .constants import PLEX_PAGE_SIZE, PLEX_PAGE_WORKERS
+
+        key = self._section_key(section_name)
+        args = {"includeGuids": 1}
+        args.update(filters or {})
+
+        first = self._query_page(key, args, 0, PLEX_PAGE_SIZE)
+        total = int(first.attrib.get("totalSize", first.attrib.get("size", 0)))
+        for elem in first:
+            yield build_record(elem)
+
+        starts = range(PLEX_PAGE_SIZE, total, PLEX_PAGE_SIZE)
+        if not starts:
+            return
+
+        with ThreadPoolExecutor(max_workers=PLEX_PAGE_WORKERS, thread_name_prefix="plex-page") as pool:
+            pending = deque()
+            for start in starts:
+                pending.append(pool.submit(self._query_page, key, args, start, PLEX_PAGE_SIZE))
+                if len(pending) >= PLEX_PAGE_WORKERS * 2:
+                    for elem in pending.popleft().result():
+                        yield build_record(elem)
+            while pending:
+                for elem in pending.popleft().result():
+                    yield build_record(elem)
+
+    def _section_key(self, section_name):
+        return self.server.library.section(section_name).key
+
+    def _query_page(self, section_key, args, start, size):
+        page_args = dict(args)
+        page_args["X-Plex-Container-Start"] = start
+        page_args["X-Plex-Container-Size"] = size
+        # joinArgs leaves keys unescaped, which Plex needs for operators like updatedAt>>
+        return self.server.query(f"/library/sections/{section_key}/all{plex_utils.joinArgs(page_args)}")
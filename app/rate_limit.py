@@ -0,0 +1,60 @@
+"""Token-bucket rate limiting for outbound API requests."""
+import time
+import threading
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second with bursts of up to ``capacity``.
+
+    Tokens refill continuously; ``acquire`` blocks until one is available,
+    so any number of threads can share one bucket to stay under an API's
+    request limit.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1, timeout=None):
+        """Take ``tokens`` from the bucket, waiting if needed. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    if waited:
+                        self.waits += 1
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            waited = True
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Hold back every caller for ``seconds``, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def stats(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate_per_second": self.rate,
+                "capacity": self.capacity,
+                "available": round(self._tokens, 2),
+                "waits": self.waits,
+            }
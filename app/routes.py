@@ -1,5 +1,11 @@
+import threading
 from flask import Blueprint, Flask, render_template, jsonify, send_from_directory
+from werkzeug.serving import is_running_from_reloader
+from .cache_manager import CacheManager, TMDbStore
+from .framed_prefetch import FramedPrefetcher
+from .game_buffer import GameBuffer
 from .plex_service import PlexService
+from .tmdb_prefetch import TMDbPrefetcher
 from .tmdb_service import TMDbService
 from .trivia import TriviaEngine
 from .utils import handle_trivia_response, with_error_handling
@@ -10,6 +16,61 @@ from pathlib import Path
 def init_routes(app: Flask, plex_service: PlexService, tmdb_service: TMDbService):
     bp = Blueprint("main", __name__)
     trivia = TriviaEngine(plex_service, tmdb_service)
+    prefetcher = TMDbPrefetcher(plex_service, tmdb_service)
+    cache_manager = CacheManager([
+        trivia.framed_store,
+        trivia.cast_match_store,
+        TMDbStore(tmdb_service.cache),
+    ])
+    game_buffer = GameBuffer(
+        {
+            "trivia": trivia.random_question,
+            "timeline": trivia.timeline_challenge,
+            "year": trivia.guess_year,
+            "poster": trivia.poster_reveal,
+            "framed": trivia.framed,
+            "cast_match": trivia.cast_match,
+            "name_the_cast": trivia.name_the_cast,
+            "quote": trivia.quote_game,
+        },
+        generation=lambda: plex_service.generation,
+        # Cold Framed extractions only happen through the idle-gated FramedPrefetcher
+        producers={"framed": lambda: trivia.framed(cached_only=True)},
+        ready={"framed": trivia.framed_next_ready},
+        valid={"framed": trivia.framed_payload_valid},
+    )
+    framed_prefetcher = FramedPrefetcher(trivia, game_buffer.load)
+    background_lock = threading.Lock()
+    background_started = []
+
+    def start_background_jobs():
+        """Start the janitor, game buffer and prefetch jobs, once per serving process."""
+        from .constants import TMDB_PREFETCH_ON_STARTUP
+
+        with background_lock:
+            if background_started:
+                return
+            background_started.append(True)
+        cache_manager.start()
+        if plex_service.server:
+            game_buffer.start()
+            framed_prefetcher.start()
+            if TMDB_PREFETCH_ON_STARTUP:
+                prefetcher.start()
+
+    # The reloader's watcher process also creates the app but never serves a
+    # request, so outside the reloader's serving child the jobs wait for one
+    if is_running_from_reloader():
+        start_background_jobs()
+
+    @bp.before_app_request
+    def track_request_start():
+        start_background_jobs()
+        game_buffer.load.enter()
+
+    @bp.teardown_app_request
+    def track_request_end(exc):
+        game_buffer.load.exit()
 
     @bp.route("/")
     def index():
@@ -52,31 +113,31 @@ def init_routes(app: Flask, plex_service: PlexService, tmdb_service: TMDbService
     @bp.route("/api/trivia")
     @with_error_handling
     def api_trivia():
-        q = trivia.random_question()
+        q = game_buffer.take("trivia")
         return handle_trivia_response(q)
 
     @bp.route("/api/trivia/cast")
     @with_error_handling
     def api_trivia_cast():
-        q = trivia.timeline_challenge()
+        q = game_buffer.take("timeline")
         return handle_trivia_response(q)
 
     @bp.route("/api/trivia/year")
     @with_error_handling
     def api_trivia_year():
-        q = trivia.guess_year()
+        q = game_buffer.take("year")
         return handle_trivia_response(q, "Could not generate year game")
 
     @bp.route("/api/trivia/timeline")
     @with_error_handling
     def api_trivia_timeline():
-        q = trivia.timeline_challenge()
+        q = game_buffer.take("timeline")
         return handle_trivia_response(q)
 
     @bp.route("/api/trivia/poster")
     @with_error_handling
     def api_trivia_poster():
-        q = trivia.poster_reveal()
+        q = game_buffer.take("poster")
         return handle_trivia_response(q)
 
     @bp.route("/api/trivia/framed")
@@ -89,25 +150,25 @@ def init_routes(app: Flask, plex_service: PlexService, tmdb_service: TMDbService
         if not movies:
             return jsonify({"error": "No movies found in Plex library"}), 404
 
-        result = trivia.framed()
+        result = game_buffer.take("framed")
         return handle_trivia_response(result, "Could not generate Framed game")
 
     @bp.route("/api/trivia/cast-match")
     @with_error_handling
     def api_trivia_cast_match():
-        result = trivia.cast_match()
+        result = game_buffer.take("cast_match")
         return handle_trivia_response(result, "Could not generate Cast Match game")
 
     @bp.route("/api/trivia/name-the-cast")
     @with_error_handling
     def api_trivia_name_the_cast():
-        result = trivia.name_the_cast()
+        result = game_buffer.take("name_the_cast")
         return handle_trivia_response(result, "Could not generate Name the Cast game")
 
     @bp.route("/api/trivia/quote")
     @with_error_handling
     def api_trivia_quote():
-        result = trivia.quote_game()
+        result = game_buffer.take("quote")
         return handle_trivia_response(result, "Could not generate Quote game")
 
     @bp.route("/api/framed/frames/<filename>")
@@ -168,22 +229,13 @@ def init_routes(app: Flask, plex_service: PlexService, tmdb_service: TMDbService
     @bp.route("/api/cache/clear", methods=["POST"])
     def api_clear_cache():
         try:
-            # Clear Framed game cache
-            framed_cache_count = 0
-            for cache_file in trivia.framed_cache_dir.glob("*"):
-                cache_file.unlink()
-                framed_cache_count += 1
-
-            # Clear Cast Match cache
-            cast_match_cache_count = 0
-            for cache_file in trivia.cast_match_cache_dir.glob("*"):
-                cache_file.unlink()
-                cast_match_cache_count += 1
+            # Swap in empty directories; the old ones are deleted in the background
+            framed_cache_count = trivia.framed_store.clear()
+            cast_match_cache_count = trivia.cast_match_store.clear()
             trivia._actor_index = None
 
             # Clear TMDb cache
-            tmdb_cache_count = len(list(tmdb_service.cache.cache_dir.glob("*.json")))
-            tmdb_service.cache.clear_cache()
+            tmdb_cache_count = tmdb_service.cache.clear_cache()
 
             total_count = framed_cache_count + cast_match_cache_count + tmdb_cache_count
             return jsonify({
@@ -197,41 +249,63 @@ def init_routes(app: Flask, plex_service: PlexService, tmdb_service: TMDbService
     def api_cache_info():
         try:
             # Framed game cache info
-            framed_cache_files = list(trivia.framed_cache_dir.glob("*"))
-            framed_total_size = sum(f.stat().st_size for f in framed_cache_files)
+            framed_usage = trivia.framed_store.usage()
+            framed_total_size = framed_usage["bytes"]
 
             # Cast Match cache info
-            cast_match_cache_files = list(trivia.cast_match_cache_dir.glob("*"))
-            cast_match_total_size = sum(f.stat().st_size for f in cast_match_cache_files)
+            cast_match_usage = trivia.cast_match_store.usage()
+            cast_match_total_size = cast_match_usage["bytes"]
 
             # TMDb cache info
-            tmdb_cache_dir = tmdb_service.cache.cache_dir
-            tmdb_cache_files = list(tmdb_cache_dir.glob("*.json"))
-            tmdb_total_size = sum(f.stat().st_size for f in tmdb_cache_files)
+            tmdb_cache = tmdb_service.cache
+            tmdb_total_size = tmdb_cache.size_bytes()
 
             total_size = framed_total_size + cast_match_total_size + tmdb_total_size
 
             return jsonify({
                 "framed_cache": {
-                    "count": len(framed_cache_files),
+                    "count": framed_usage["count"],
                     "total_size_mb": round(framed_total_size / (1024 * 1024), 2),
                     "cache_dir": str(trivia.framed_cache_dir)
                 },
                 "cast_match_cache": {
-                    "count": len(cast_match_cache_files),
+                    "count": cast_match_usage["count"],
                     "total_size_mb": round(cast_match_total_size / (1024 * 1024), 2),
                     "cache_dir": str(trivia.cast_match_cache_dir)
                 },
                 "tmdb_cache": {
-                    "count": len(tmdb_cache_files),
+                    "count": tmdb_cache.count(),
                     "total_size_mb": round(tmdb_total_size / (1024 * 1024), 2),
-                    "cache_dir": str(tmdb_cache_dir)
+                    "cache_dir": str(tmdb_cache.db_path),
+                    "memory": tmdb_cache.memory.stats(),
+                    "negative_hits": tmdb_cache.negative_hits,
+                    "single_flight": tmdb_service.single_flight.stats(),
+                    "api": tmdb_service.transport.stats()
                 },
-                "total_cache_size_mb": round(total_size / (1024 * 1024), 2)
+                "total_cache_size_mb": round(total_size / (1024 * 1024), 2),
+                "janitor": cache_manager.status(),
+                "game_buffer": game_buffer.stats(),
+                "eligible_movies": trivia.eligibility.stats(),
+                "frame_extraction": trivia.frame_extractor.stats()
             })
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @bp.route("/api/prefetch/status")
+    def api_prefetch_status():
+        return jsonify(prefetcher.status())
+
+    @bp.route("/api/prefetch/framed/status")
+    def api_framed_prefetch_status():
+        return jsonify(framed_prefetcher.status())
+
+    @bp.route("/api/prefetch/start", methods=["POST"])
+    def api_prefetch_start():
+        if not plex_service.server:
+            return jsonify({"error": "Plex server not connected"}), 500
+        started = prefetcher.start()
+        return jsonify({"started": started, **prefetcher.status()})
+
     @bp.route("/api/performance/opencv")
     def api_opencv_performance():
         try:
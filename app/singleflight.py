@@ -0,0 +1,71 @@
+"""Per-key request coalescing for concurrent fetches of the same resource."""
+import threading
+
+
+class FlightTimeout(Exception):
+    """Raised to a waiting caller when the in-flight call does not finish within its timeout."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for that result instead of starting their own call.
+    ``suppressed`` counts how many duplicate calls were avoided.
+    """
+
+    def __init__(self):
+        self.executions = 0
+        self.suppressed = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        """Return ``fn()``, sharing the result with concurrent callers for ``key``.
+
+        A caller that joins a call already in flight waits at most ``timeout``
+        seconds for it and then raises ``FlightTimeout``; the call keeps running.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.suppressed += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise FlightTimeout(f"Call for {key} still in flight after {timeout}s")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        return {
+            "executions": self.executions,
+            "suppressed": self.suppressed,
+            "in_flight": len(self._calls),
+        }
@@ -1,34 +1,283 @@
 """TMDb caching layer for long-lived API response storage."""
 import json
 import time
+import sqlite3
 import logging
+import threading
 from pathlib import Path
-from threading import Lock
 import hashlib
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
 class DictObject:
-    """Simple class to convert dictionaries to objects with attribute access."""
+    """Lazy attribute view over a decoded JSON dictionary.
+
+    Nothing is copied up front: nested dicts and lists are wrapped only when
+    the attribute holding them is first read, and the wrapped value is kept
+    for later reads. The underlying dict is shared with the cache, so the
+    view is read-only.
+    """
+
+    __slots__ = ("_data", "_wrapped")
+
     def __init__(self, data):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, dict):
-                    setattr(self, key, DictObject(value))
-                elif isinstance(value, list):
-                    setattr(self, key, [DictObject(item) if isinstance(item, dict) else item for item in value])
-                else:
-                    setattr(self, key, value)
+        object.__setattr__(self, "_data", data if isinstance(data, dict) else {})
+        object.__setattr__(self, "_wrapped", {})
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in DictObject.__slots__:
+            raise AttributeError(name)
+        wrapped = self._wrapped
+        if name in wrapped:
+            return wrapped[name]
+        try:
+            value = self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        if isinstance(value, dict):
+            value = DictObject(value)
+        elif isinstance(value, list):
+            value = [DictObject(item) if isinstance(item, dict) else item for item in value]
         else:
-            self.__dict__ = data
+            return value
+        wrapped[name] = value
+        return value
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __dir__(self):
+        return list(self._data)
+
+    def __reduce__(self):
+        return (DictObject, (self._data,))
+
+    def __repr__(self):
+        return f"DictObject({self._data!r})"
+
+    def to_dict(self):
+        """Return the underlying dictionary."""
+        return self._data
+
+
+class _Negative:
+    """Sentinel for a cached "TMDb has nothing for this id" answer."""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "NEGATIVE"
+
+
+NEGATIVE = _Negative()
+NEGATIVE_KEY = "__negative_until__"
+
+
+class MemoryTier:
+    """Bounded in-memory LRU of decoded cache payloads.
+
+    Bounded both by entry count and by an approximate byte total, taken from
+    the length of each entry's serialized JSON.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(True, data)`` on a hit and ``(False, None)`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, data, size):
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (data, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_mb": round(self.bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+ENTRIES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        kind TEXT,
+        data TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        accessed REAL
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+        UPDATE stats SET count = count + 1, bytes = bytes + length(NEW.data) WHERE id = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF data ON entries BEGIN
+        UPDATE stats SET bytes = bytes - length(OLD.data) + length(NEW.data) WHERE id = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+        UPDATE stats SET count = count - 1, bytes = bytes - length(OLD.data) WHERE id = 0;
+    END""",
+]
+ENTRIES_TRIGGERS = ["entries_insert", "entries_update", "entries_delete"]
+
 
 class TMDbCache:
-    """Cache for TMDb API responses with indefinite persistence."""
+    """Cache for TMDb API responses, kept until evicted as least recently used.
+
+    Entries live in a single SQLite database in WAL mode, so any number of
+    threads can read while one writes. Each thread gets its own connection,
+    and entry count and total size are kept in a ``stats`` row maintained by
+    triggers so they can be read without scanning. A ``MemoryTier`` in front
+    of the database serves hot entries without touching disk.
+
+    Reads, including memory-tier hits, note the entry's access time in
+    memory; the times are written to the ``accessed`` column in one batch
+    when the janitor asks for eviction candidates.
+    """
+
+    def __init__(self, db_path=None, legacy_dir=None):
+        from .constants import (
+            TMDB_CACHE_DB_PATH, TMDB_LEGACY_CACHE_DIR,
+            TMDB_MEMORY_CACHE_ENTRIES, TMDB_MEMORY_CACHE_MB,
+        )
+
+        self.db_path = Path(db_path or TMDB_CACHE_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.memory = MemoryTier(TMDB_MEMORY_CACHE_ENTRIES, TMDB_MEMORY_CACHE_MB * 1024 * 1024)
+        self._local = threading.local()
+        self._accessed = {}
+        self._accessed_lock = threading.Lock()
+        self.negative_hits = 0
+        self._init_db()
+        self.migrate_json_dir(legacy_dir or TMDB_LEGACY_CACHE_DIR)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS stats (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                count INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO stats (id, count, bytes) VALUES (0, 0, 0);
+        """)
+        for statement in ENTRIES_SCHEMA:
+            conn.execute(statement)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        if "accessed" not in columns:
+            conn.execute("ALTER TABLE entries ADD COLUMN accessed REAL")
+        # Cast lists are now derived from the movie details record. Rows imported from
+        # the JSON cache before kinds were recorded have no kind; cast lists are the only lists
+        conn.execute(
+            "DELETE FROM entries WHERE kind IN ('movie_cast', 'movie_cast_extended') "
+            "OR (kind IS NULL AND data LIKE '[%')"
+        )
+        # Tables swapped out by a clear that did not finish dropping them
+        leftovers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'entries_trash_%'"
+        ).fetchall()
+        if leftovers:
+            self._drop_in_background([name for (name,) in leftovers])
+
+    def migrate_json_dir(self, legacy_dir):
+        """Import a pre-SQLite ``cache/tmdb_data`` directory once, then remove it."""
+        legacy_dir = Path(legacy_dir)
+        if not legacy_dir.is_dir():
+            return 0
+
+        rows = {}
+        for cache_file in legacy_dir.glob("*.json"):
+            try:
+                with open(cache_file, 'r') as f:
+                    cached_data = json.load(f)
+                data = cached_data.get('data')
+                kind = self._legacy_kind(data)
+                if kind == "movie_cast":
+                    # Cast lists are derived from the movie details record now
+                    continue
+                rows.setdefault(kind, []).append((
+                    cache_file.stem,
+                    json.dumps(data, separators=(',', ':')),
+                    cached_data.get('timestamp', time.time()),
+                ))
+            except Exception as e:
+                logger.error(f"Skipping unreadable TMDb cache file {cache_file}: {e}")
+
+        migrated = sum(len(kind_rows) for kind_rows in rows.values())
+        try:
+            for kind, kind_rows in rows.items():
+                self._write_rows(kind, kind_rows)
+            for cache_file in legacy_dir.glob("*.json"):
+                cache_file.unlink()
+            legacy_dir.rmdir()
+            logger.info(f"Migrated {migrated} TMDb cache files from {legacy_dir} to {self.db_path}")
+        except Exception as e:
+            logger.error(f"Error migrating TMDb cache directory {legacy_dir}: {e}")
+        return migrated
 
-    def __init__(self, cache_dir="cache/tmdb_data"):
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_lock = Lock()
+    @staticmethod
+    def _legacy_kind(data):
+        """Guess the cache type of a JSON cache file payload; its key is a hash and does not say."""
+        if isinstance(data, list):
+            return "movie_cast"
+        if isinstance(data, dict):
+            if "birthday" in data or "known_for_department" in data:
+                return "person_details"
+            if "title" in data:
+                return "movie_details"
+        return None
 
     def _serialize_tmdb_object(self, obj):
         """Convert TMDb objects to JSON-serializable dictionaries."""
@@ -44,6 +293,9 @@ class TMDbCache:
         if isinstance(obj, dict):
             return {k: self._serialize_tmdb_object(v) for k, v in obj.items()}
 
+        if isinstance(obj, DictObject):
+            return obj.to_dict()
+
         if hasattr(obj, '__dict__'):
             result = {}
             for key, value in obj.__dict__.items():
@@ -66,28 +318,8 @@ class TMDbCache:
     def set_movie_details(self, movie_id, data):
         """Cache movie details."""
         cache_key = self._get_cache_key("movie_details", movie_id)
-        self._cache_data(cache_key, data)
+        self._cache_data(cache_key, data, "movie_details")
     
-    def get_movie_cast(self, movie_id):
-        """Get cached movie cast."""
-        cache_key = self._get_cache_key("movie_cast", movie_id)
-        return self._get_cached_data(cache_key)
-    
-    def set_movie_cast(self, movie_id, data):
-        """Cache movie cast."""
-        cache_key = self._get_cache_key("movie_cast", movie_id)
-        self._cache_data(cache_key, data)
-
-    def get_movie_cast_extended(self, movie_id):
-        """Get cached extended movie cast."""
-        cache_key = self._get_cache_key("movie_cast_extended", movie_id)
-        return self._get_cached_data(cache_key)
-
-    def set_movie_cast_extended(self, movie_id, data):
-        """Cache extended movie cast."""
-        cache_key = self._get_cache_key("movie_cast_extended", movie_id)
-        self._cache_data(cache_key, data)
-
     def get_person_details(self, person_id):
         """Get cached person details."""
         cache_key = self._get_cache_key("person_details", person_id)
@@ -96,63 +328,246 @@ class TMDbCache:
     def set_person_details(self, person_id, data):
         """Cache person details."""
         cache_key = self._get_cache_key("person_details", person_id)
-        self._cache_data(cache_key, data)
-    
+        self._cache_data(cache_key, data, "person_details")
+
+    def set_negative(self, cache_type, item_id, ttl):
+        """Remember for ``ttl`` seconds that an id has no data.
+
+        Lookups return ``NEGATIVE`` until the entry expires, after which it
+        reads as an ordinary miss.
+        """
+        cache_key = self._get_cache_key(cache_type, item_id)
+        self._cache_data(cache_key, {NEGATIVE_KEY: time.time() + ttl}, cache_type)
+
+    def get_many(self, cache_type, item_ids):
+        """Get cached entries for several ids of one type as ``{id: data}``.
+
+        Negative entries are included as ``NEGATIVE``; expired ones are left out.
+        """
+        keys = {self._get_cache_key(cache_type, item_id): item_id for item_id in item_ids}
+        results = {}
+        key_list = []
+        for cache_key, item_id in keys.items():
+            hit, data = self.memory.get(cache_key)
+            if hit:
+                self._record_access(cache_key)
+            if not hit:
+                key_list.append(cache_key)
+            elif (data := self._wrap(data)) is not None:
+                results[item_id] = data
+        try:
+            conn = self._connection()
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, data FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for cache_key, raw in rows:
+                    self._record_access(cache_key)
+                    data = self._load(cache_key, raw)
+                    if data is not None:
+                        results[keys[cache_key]] = data
+        except Exception as e:
+            logger.error(f"Error reading TMDb cache entries for {cache_type}: {e}")
+        return results
+
+    def set_many(self, cache_type, items):
+        """Cache several ``{id: data}`` entries of one type in a single transaction."""
+        rows = []
+        now = time.time()
+        for item_id, data in items.items():
+            if data is None:
+                continue
+            cache_key = self._get_cache_key(cache_type, item_id)
+            plain = self._serialize_tmdb_object(data)
+            serialized = json.dumps(plain, separators=(',', ':'))
+            self.memory.put(cache_key, plain, len(serialized))
+            rows.append((cache_key, serialized, now))
+        try:
+            self._write_rows(cache_type, rows)
+        except Exception as e:
+            logger.error(f"Error writing TMDb cache entries for {cache_type}: {e}")
+
+    def _write_rows(self, cache_type, rows):
+        if not rows:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO entries (key, kind, data, timestamp) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET data = excluded.data, timestamp = excluded.timestamp",
+                [(cache_key, cache_type, data, timestamp) for cache_key, data, timestamp in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _load(self, cache_key, raw):
+        """Decode a row from disk and promote it into the memory tier."""
+        data = json.loads(raw)
+        self.memory.put(cache_key, data, len(raw))
+        return self._wrap(data)
+
+    def _wrap(self, data):
+        if data and isinstance(data, dict):
+            if NEGATIVE_KEY in data:
+                if data[NEGATIVE_KEY] < time.time():
+                    return None
+                self.negative_hits += 1
+                return NEGATIVE
+            return DictObject(data)
+        return data
+
     def _get_cached_data(self, cache_key):
         """Retrieve cached data if it exists."""
         if not cache_key:
             return None
 
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        hit, data = self.memory.get(cache_key)
+        if hit:
+            self._record_access(cache_key)
+            return self._wrap(data)
 
         try:
-            with self.cache_lock:
-                if cache_file.exists():
-                    with open(cache_file, 'r') as f:
-                        cached_data = json.load(f)
-                    logger.debug(f"TMDb cache hit for key: {cache_key}")
-                    data = cached_data.get('data')
-                    if data and isinstance(data, dict):
-                        return DictObject(data)
-                    return data
+            row = self._connection().execute(
+                "SELECT data FROM entries WHERE key = ?", (cache_key,)
+            ).fetchone()
+            if row is not None:
+                logger.debug(f"TMDb cache hit for key: {cache_key}")
+                self._record_access(cache_key)
+                return self._load(cache_key, row[0])
         except Exception as e:
-            logger.error(f"Error reading TMDb cache file {cache_file}: {e}")
-            try:
-                cache_file.unlink()
-            except:
-                pass
+            logger.error(f"Error reading TMDb cache entry {cache_key}: {e}")
 
         return None
     
-    def _cache_data(self, cache_key, data):
+    def _record_access(self, cache_key):
+        with self._accessed_lock:
+            self._accessed[cache_key] = time.time()
+
+    def flush_access_times(self):
+        """Write the access times noted since the last flush to disk in one transaction."""
+        with self._accessed_lock:
+            pending, self._accessed = self._accessed, {}
+        if not pending:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, cache_key) for cache_key, accessed in pending.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _cache_data(self, cache_key, data, cache_type=None):
         """Store data in cache with timestamp."""
         if not cache_key or data is None:
             return
 
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        try:
+            plain = self._serialize_tmdb_object(data)
+            serialized_data = json.dumps(plain, separators=(',', ':'))
+            self.memory.put(cache_key, plain, len(serialized_data))
+            self._write_rows(cache_type, [(cache_key, serialized_data, time.time())])
+            logger.debug(f"Cached TMDb data with key: {cache_key}")
+        except Exception as e:
+            logger.error(f"Error writing TMDb cache entry {cache_key}: {e}")
+
+    def count(self):
+        """Return the number of cached entries."""
+        return self._stats()[0]
+
+    def size_bytes(self):
+        """Return the approximate size of all cached payloads in bytes."""
+        return self._stats()[1]
 
+    def _stats(self):
         try:
-            with self.cache_lock:
-                serialized_data = self._serialize_tmdb_object(data)
-                cache_entry = {
-                    'data': serialized_data,
-                    'timestamp': time.time()
-                }
-                with open(cache_file, 'w') as f:
-                    json.dump(cache_entry, f, separators=(',', ':'))
-                logger.debug(f"Cached TMDb data with key: {cache_key}")
+            row = self._connection().execute("SELECT count, bytes FROM stats WHERE id = 0").fetchone()
+            return (row[0], row[1]) if row else (0, 0)
         except Exception as e:
-            logger.error(f"Error writing TMDb cache file {cache_file}: {e}")
-    
+            logger.error(f"Error reading TMDb cache stats: {e}")
+            return (0, 0)
+
+    def expire_negatives(self):
+        """Delete negative entries whose TTL has passed. Returns the count removed."""
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT key FROM entries WHERE data LIKE ? AND json_extract(data, ?) < ?",
+            (f'{{"{NEGATIVE_KEY}":%', f"$.{NEGATIVE_KEY}", time.time()),
+        )
+        keys = [row[0] for row in rows]
+        self.evict(keys)
+        return len(keys)
+
+    def eviction_candidates(self):
+        """Return ``(last_used, size, key)`` for every entry, where ``last_used`` is the later of its fetch and last read."""
+        self.flush_access_times()
+        return self._connection().execute(
+            "SELECT max(timestamp, coalesce(accessed, 0)), length(data), key FROM entries"
+        ).fetchall()
+
+    def evict(self, keys):
+        """Delete the given cache keys from memory and disk."""
+        if not keys:
+            return
+        for cache_key in keys:
+            self.memory.discard(cache_key)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(cache_key,) for cache_key in keys])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
     def clear_cache(self):
-        """Clear all TMDb cache files."""
+        """Clear all TMDb cache entries.
+
+        The entries table is swapped for an empty one in a single
+        transaction and the old table is dropped on a background thread, so
+        the caller never waits for a row-by-row delete.
+        """
         try:
-            with self.cache_lock:
-                for cache_file in self.cache_dir.glob("*.json"):
-                    try:
-                        cache_file.unlink()
-                        logger.info(f"Removed TMDb cache file: {cache_file.name}")
-                    except Exception as e:
-                        logger.error(f"Error removing TMDb cache file {cache_file}: {e}")
+            conn = self._connection()
+            trash = f"entries_trash_{time.time_ns()}"
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = self.count()
+                for trigger in ENTRIES_TRIGGERS:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                conn.execute(f"ALTER TABLE entries RENAME TO {trash}")
+                for statement in ENTRIES_SCHEMA:
+                    conn.execute(statement)
+                conn.execute("UPDATE stats SET count = 0, bytes = 0 WHERE id = 0")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self.memory.clear()
+            self._drop_in_background([trash])
+            logger.info(f"Removed {removed} TMDb cache entries")
+            return removed
         except Exception as e:
             logger.error(f"Error during TMDb cache cleanup: {e}")
+            return 0
+
+    def _drop_in_background(self, tables):
+        def drop():
+            conn = self._connection()
+            for table in tables:
+                try:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                except Exception as e:
+                    logger.error(f"Error dropping cleared TMDb cache table {table}: {e}")
+
+        threading.Thread(target=drop, name="tmdb-cache-clear", daemon=True).start()
@@ -0,0 +1,153 @@
+"""Background job that fills the TMDb cache for the whole movie library."""
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .tmdb_cache import NEGATIVE
+from .tmdb_schema import is_current
+
+logger = logging.getLogger(__name__)
+
+
+class TMDbPrefetcher:
+    """Fetches movie details and top-cast person details ahead of the games.
+
+    Runs in two phases: movie details (with credits) for every library movie
+    that has a TMDb id, then person details for the top
+    ``TMDB_PREFETCH_CAST_DEPTH`` cast members of each. Anything already in
+    ``TMDbCache`` is skipped, so a job interrupted by a restart picks up
+    where it stopped. Requests go through ``TMDbService`` and therefore share
+    its token bucket with request-time lookups.
+    """
+
+    def __init__(self, plex_service, tmdb_service):
+        self.plex = plex_service
+        self.tmdb = tmdb_service
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset_progress("idle")
+
+    def _reset_progress(self, state):
+        self.state = state
+        self.phase = None
+        self.total = 0
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._phase_started = None
+        self._phase_fetched = 0
+
+    def start(self):
+        """Start the job on a background thread. Returns False if it is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if not self.tmdb.client:
+                logger.info("TMDb prefetch skipped: no TMDb API key configured")
+                return False
+            self._stop.clear()
+            self._reset_progress("running")
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="tmdb-prefetch", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self):
+        """Ask a running job to stop after the requests already in flight."""
+        self._stop.set()
+
+    def status(self):
+        """Return progress for the current or last run."""
+        eta = None
+        if self.state == "running" and self._phase_fetched and self._phase_started:
+            elapsed = time.time() - self._phase_started
+            remaining = self.total - self.done
+            eta = round(remaining * elapsed / self._phase_fetched, 1)
+
+        return {
+            "state": self.state,
+            "phase": self.phase,
+            "done": self.done,
+            "total": self.total,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "percent": round(100 * self.done / self.total, 1) if self.total else 0.0,
+            "eta_seconds": eta,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "rate_limit": self.tmdb.rate_limiter.stats(),
+        }
+
+    def _run(self):
+        from .constants import TMDB_PREFETCH_CAST_DEPTH
+
+        try:
+            movie_ids = list(dict.fromkeys(m.tmdb_id for m in self.plex.get_tmdb_index().movies))
+            details = self._prefetch(
+                "movie_details",
+                movie_ids,
+                self.tmdb.get_movie_details,
+                is_cached=lambda data: data is NEGATIVE or is_current(data),
+            )
+
+            person_ids = []
+            for record in details.values():
+                person_ids.extend(self.tmdb.top_cast_ids(record, TMDB_PREFETCH_CAST_DEPTH))
+            self._prefetch("person_details", list(dict.fromkeys(person_ids)), self.tmdb.get_person_details)
+
+            self.state = "stopped" if self._stop.is_set() else "finished"
+        except Exception as e:
+            logger.error(f"TMDb prefetch failed: {e}")
+            self.state = "error"
+        finally:
+            self.finished_at = time.time()
+            logger.info(
+                f"TMDb prefetch {self.state}: {self.done}/{self.total} {self.phase}, "
+                f"{self.skipped} already cached, {self.failed} failed"
+            )
+
+    def _prefetch(self, cache_type, item_ids, fetch, is_cached=None):
+        """Fetch every id not already cached. Returns ``{id: data}`` for all ids."""
+        from .constants import TMDB_PREFETCH_WORKERS
+
+        cached = self.tmdb.cache.get_many(cache_type, item_ids)
+        if is_cached is not None:
+            cached = {item_id: data for item_id, data in cached.items() if is_cached(data)}
+        missing = [item_id for item_id in item_ids if item_id not in cached]
+
+        self.phase = cache_type
+        self.total = len(item_ids)
+        self.skipped = self.done = len(cached)
+        self._phase_started = time.time()
+        self._phase_fetched = 0
+        logger.info(f"TMDb prefetch {cache_type}: {len(missing)} to fetch, {len(cached)} already cached")
+
+        results = dict(cached)
+        with ThreadPoolExecutor(max_workers=TMDB_PREFETCH_WORKERS, thread_name_prefix="tmdb-prefetch") as pool:
+            pending = deque()
+            for item_id in missing:
+                if self._stop.is_set():
+                    break
+                pending.append((item_id, pool.submit(fetch, item_id)))
+                if len(pending) >= TMDB_PREFETCH_WORKERS * 2:
+                    self._collect(results, *pending.popleft())
+            while pending:
+                self._collect(results, *pending.popleft())
+        return results
+
+    def _collect(self, results, item_id, future):
+        try:
+            data = future.result()
+        except Exception as e:
+            logger.error(f"TMDb prefetch of {item_id} failed: {e}")
+            data = None
+        if data is None:
+            self.failed += 1
+        else:
+            results[item_id] = data
+        self.done += 1
+        self._phase_fetched += 1
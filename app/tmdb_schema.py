@@ -0,0 +1,61 @@
+"""Projections that trim TMDb API payloads to the fields the games read.
+
+Raw ``details(append_to_response="credits")`` payloads carry the full crew,
+production companies, spoken languages and more. Only the fields listed in
+the schemas below are cached. Each projected record stores the schema
+version it was built with; bump ``version`` whenever a field is added and
+older cached records are treated as misses and fetched again.
+"""
+from .constants import DEFAULT_CAST_LIMIT
+from .utils import get_field
+
+MOVIE_DETAILS_SCHEMA = {
+    "version": 1,
+    "fields": ["id", "title", "overview", "release_date", "vote_average", "poster_path"],
+    "genre_fields": ["id", "name"],
+    "cast_fields": ["id", "name", "character", "order", "popularity", "profile_path"],
+    "cast_limit": DEFAULT_CAST_LIMIT,
+    "crew_fields": ["id", "name", "job"],
+    "crew_jobs": ["Director"],
+}
+
+VERSION_KEY = "schema_version"
+
+
+def _pick(obj, fields):
+    return {name: get_field(obj, name) for name in fields}
+
+
+def project_movie_details(details, schema=MOVIE_DETAILS_SCHEMA):
+    """Build a compact, versioned movie record from a TMDb details payload."""
+    record = _pick(details, schema["fields"])
+    record[VERSION_KEY] = schema["version"]
+    record["genres"] = [
+        _pick(genre, schema["genre_fields"]) for genre in get_field(details, "genres", []) or []
+    ]
+
+    credits = get_field(details, "credits")
+    cast = get_field(credits, "cast", []) or []
+    crew = get_field(credits, "crew", []) or []
+
+    projected_cast = []
+    for index, actor in enumerate(cast[:schema["cast_limit"]]):
+        entry = _pick(actor, schema["cast_fields"])
+        if entry.get("order") is None:
+            entry["order"] = index
+        projected_cast.append(entry)
+
+    record["credits"] = {
+        "cast": projected_cast,
+        "crew": [
+            _pick(person, schema["crew_fields"])
+            for person in crew
+            if get_field(person, "job") in schema["crew_jobs"]
+        ],
+    }
+    return record
+
+
+def is_current(record, schema=MOVIE_DETAILS_SCHEMA):
+    """Return True when a cached record was built with the current schema."""
+    return get_field(record, VERSION_KEY) == schema["version"]
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from themoviedb import TMDb
 import logging
-from .tmdb_cache import TMDbCache
+from themoviedb import TMDbHTTPError
+from .rate_limit import TokenBucket
+from .singleflight import SingleFlight
+from .tmdb_cache import NEGATIVE, DictObject, TMDbCache
+from .tmdb_schema import is_current, project_movie_details
+from .tmdb_transport import CircuitOpenError, ResilientTransport, build_client
+from .utils import get_field
 
 logger = logging.getLogger(__name__)
 
@@ -10,11 +15,17 @@ logger = logging.getLogger(__name__)
 class TMDbService:
     """Simple wrapper around the TMDb API client with caching."""
 
-    def __init__(self, api_key: str | None):
+    def __init__(self, api_key: str | None, host: str | None = None):
+        from .constants import TMDB_RATE_LIMIT_BURST, TMDB_RATE_LIMIT_PER_SECOND
+
         self.api_key = api_key
-        self.client = TMDb(key=api_key) if api_key else None
+        # Shared by request-time lookups and the background prefetch job
+        self.rate_limiter = TokenBucket(TMDB_RATE_LIMIT_PER_SECOND, TMDB_RATE_LIMIT_BURST)
+        self.transport = ResilientTransport(rate_limiter=self.rate_limiter)
+        self.client = build_client(api_key, self.transport, host) if api_key else None
         self._config = None
         self.cache = TMDbCache()
+        self.single_flight = SingleFlight()
 
     def _get_configuration(self):
         """Get TMDb configuration with image base URLs and sizes."""
@@ -53,14 +64,40 @@ class TMDbService:
         base_url = config["images"]["base_url"]
         return f"{base_url}{size}{file_path}"
 
-    @staticmethod
-    def _field(obj, key, default=None):
-        """Read a field from either dict-like or attribute-like objects."""
-        if obj is None:
-            return default
-        if isinstance(obj, dict):
-            return obj.get(key, default)
-        return getattr(obj, key, default)
+    def _cached_or_fetch(self, kind, item_id, get_cached, fetch):
+        """Return cached data or fetch it, coalescing concurrent misses.
+
+        Concurrent callers missing the cache for the same ``(kind, id)``
+        share one API request. The cache is checked again inside the flight
+        because a request that just finished may already have filled it.
+        A cached negative entry is returned as ``None`` without a request.
+        """
+        def load():
+            cached_data = get_cached(item_id)
+            if cached_data is not None:
+                return cached_data
+            return fetch(item_id)
+
+        cached_data = get_cached(item_id)
+        if cached_data is None:
+            cached_data = self.single_flight.do((kind, item_id), load)
+        return None if cached_data is NEGATIVE else cached_data
+
+    def _remember_failure(self, kind, item_id, error):
+        """Cache a negative entry for a failed lookup so it is not retried right away.
+
+        A 404 is remembered for ``TMDB_NEGATIVE_TTL``; other errors only for
+        ``TMDB_FAILURE_TTL``. Requests refused by the open circuit breaker
+        never reached TMDb and are not remembered.
+        """
+        from .constants import TMDB_FAILURE_TTL, TMDB_NEGATIVE_TTL
+
+        if isinstance(error, CircuitOpenError):
+            return
+        if isinstance(error, TMDbHTTPError) and error.status_code == 404:
+            self.cache.set_negative(kind, item_id, TMDB_NEGATIVE_TTL)
+        else:
+            self.cache.set_negative(kind, item_id, TMDB_FAILURE_TTL)
 
     def get_poster_url(self, poster_path: str, size: str = "w500") -> str:
         """Get a properly formatted poster URL.
@@ -79,108 +116,110 @@ class TMDbService:
         return self._build_image_url(profile_path, size)
 
     def get_movie_details(self, movie_id: int):
-        """Return details for a movie by TMDb id with credits included."""
+        """Return trimmed details for a movie by TMDb id with credits included.
+
+        Only the fields in ``MOVIE_DETAILS_SCHEMA`` are kept; records cached
+        under an older schema version are fetched again.
+        """
         if not self.client:
             return None
 
-        # Check cache first
+        return self._cached_or_fetch(
+            "movie_details", movie_id, self._cached_movie_details, self._fetch_movie_details
+        )
+
+    def _cached_movie_details(self, movie_id):
         cached_data = self.cache.get_movie_details(movie_id)
-        if cached_data is not None:
+        if cached_data is NEGATIVE or (cached_data is not None and is_current(cached_data)):
             return cached_data
+        return None
 
-        # Fetch from API if not cached
+    def _fetch_movie_details(self, movie_id):
         try:
             # Request details with credits appended
             details = self.client.movie(movie_id).details(append_to_response="credits")
             logger.info(f"Fetched movie details for {movie_id}, has credits: {hasattr(details, 'credits')}")
+            record = project_movie_details(details)
             # Cache the result
-            self.cache.set_movie_details(movie_id, details)
-            return details
+            self.cache.set_movie_details(movie_id, record)
+            return DictObject(record)
         except Exception as e:
             logger.error(f"Failed to fetch movie details: {e}")
+            self._remember_failure("movie_details", movie_id, e)
             return None
 
     def get_movie_cast(self, movie_id: int):
         """Return cast details with photos for a movie by TMDb id."""
-        if not self.client:
+        details = self.get_movie_details(movie_id)
+        if details is None:
             return None
-        
-        # Check cache first
-        cached_data = self.cache.get_movie_cast(movie_id)
-        if cached_data is not None:
-            return cached_data
-        
-        # Fetch from API if not cached
-        try:
-            credits = self.client.movie(movie_id).credits()
-            cast_with_photos = []
-            credits_cast = self._field(credits, "cast", []) or []
-
-            for actor in credits_cast[:12]:  # Limit to top 12 cast members
-                profile_path = self._field(actor, "profile_path")
-                actor_data = {
-                    "name": self._field(actor, "name"),
-                    "character": self._field(actor, "character"),
-                    "profile_path": None,
-                }
-
-                # Build proper image URL using TMDb configuration
-                if profile_path:
-                    # Use w185 for profile images (good balance of quality and performance)
-                    actor_data["profile_path"] = self.get_profile_url(
-                        profile_path, "w185"
-                    )
-
-                cast_with_photos.append(actor_data)
 
-            # Cache the result
-            self.cache.set_movie_cast(movie_id, cast_with_photos)
-            return cast_with_photos
-        except Exception as e:
-            logger.error(f"Failed to fetch movie cast: {e}")
-            return None
+        cast_with_photos = []
+        for actor in self._credits(details, "cast"):
+            profile_path = get_field(actor, "profile_path")
+            cast_with_photos.append({
+                "name": get_field(actor, "name"),
+                "character": get_field(actor, "character"),
+                # w185 is a good balance of quality and performance for profile images
+                "profile_path": self.get_profile_url(profile_path, "w185") if profile_path else None,
+            })
+        return cast_with_photos
 
     def get_movie_cast_extended(self, movie_id: int):
         """Return top-billed cast with ranking and profile metadata."""
-        if not self.client:
+        details = self.get_movie_details(movie_id)
+        if details is None:
             return None
 
-        cached_data = self.cache.get_movie_cast_extended(movie_id)
-        if cached_data is not None:
-            return cached_data
-
-        try:
-            credits = self.client.movie(movie_id).credits()
-            cast_data = []
-            credits_cast = self._field(credits, "cast", []) or []
-
-            for index, actor in enumerate(credits_cast[:12]):
-                profile_path = self._field(actor, "profile_path")
-                actor_data = {
-                    "id": self._field(actor, "id"),
-                    "name": self._field(actor, "name"),
-                    "character": self._field(actor, "character"),
-                    "order": self._field(actor, "order", index),
-                    "popularity": self._field(actor, "popularity"),
-                    "profile_path": self.get_profile_url(profile_path, "w185") if profile_path else None,
-                }
-                cast_data.append(actor_data)
-
-            self.cache.set_movie_cast_extended(movie_id, cast_data)
-            return cast_data
-        except Exception as e:
-            logger.error(f"Failed to fetch extended movie cast: {e}")
-            return None
+        cast_data = []
+        for index, actor in enumerate(self._credits(details, "cast")):
+            profile_path = get_field(actor, "profile_path")
+            cast_data.append({
+                "id": get_field(actor, "id"),
+                "name": get_field(actor, "name"),
+                "character": get_field(actor, "character"),
+                "order": get_field(actor, "order", index),
+                "popularity": get_field(actor, "popularity"),
+                "profile_path": self.get_profile_url(profile_path, "w185") if profile_path else None,
+            })
+        return cast_data
+
+    def get_movie_directors(self, movie_id: int):
+        """Return the names of every director of a movie by TMDb id."""
+        return self.directors_from_details(self.get_movie_details(movie_id))
+
+    def director_from_details(self, details):
+        """Return the first director listed in a movie details record."""
+        directors = self.directors_from_details(details)
+        return directors[0] if directors else None
+
+    def directors_from_details(self, details):
+        """Return the names of every director listed in a movie details record."""
+        return [
+            get_field(person, "name")
+            for person in self._credits(details, "crew")
+            if get_field(person, "job") == "Director" and get_field(person, "name")
+        ]
+
+    def top_cast_ids(self, details, limit):
+        """Return TMDb person ids of the top-billed cast in a movie details record."""
+        ids = (get_field(actor, "id") for actor in self._credits(details, "cast")[:limit])
+        return [person_id for person_id in ids if person_id]
+
+    def _credits(self, details, key):
+        """Return the cast or crew list from a movie details record."""
+        return get_field(get_field(details, "credits"), key, []) or []
 
     def get_person_details(self, person_id: int):
         """Return person details used for cast hint generation."""
         if not self.client:
             return None
 
-        cached_data = self.cache.get_person_details(person_id)
-        if cached_data is not None:
-            return cached_data
+        return self._cached_or_fetch(
+            "person_details", person_id, self.cache.get_person_details, self._fetch_person_details
+        )
 
+    def _fetch_person_details(self, person_id):
         try:
             person_api = self.client.person(person_id)
             person_obj = None
@@ -192,7 +231,7 @@ class TMDbService:
             except Exception:
                 person_obj = person_api.details()
 
-            movie_credits_obj = self._field(person_obj, "movie_credits")
+            movie_credits_obj = get_field(person_obj, "movie_credits")
             if not movie_credits_obj:
                 movie_credits_method = getattr(person_api, "movie_credits", None)
                 if callable(movie_credits_method):
@@ -202,24 +241,32 @@ class TMDbService:
                         movie_credits_obj = None
 
             known_for_titles = []
-            cast_credits = self._field(movie_credits_obj, "cast", []) or []
+            cast_credits = get_field(movie_credits_obj, "cast", []) or []
             for movie in cast_credits:
-                title = self._field(movie, "title")
+                title = get_field(movie, "title")
                 if title and title not in known_for_titles:
                     known_for_titles.append(title)
                 if len(known_for_titles) >= 8:
                     break
 
+            if not get_field(person_obj, "name"):
+                from .constants import TMDB_NEGATIVE_TTL
+
+                logger.info(f"No TMDb details for person {person_id}")
+                self.cache.set_negative("person_details", person_id, TMDB_NEGATIVE_TTL)
+                return None
+
             payload = {
                 "id": person_id,
-                "name": self._field(person_obj, "name"),
-                "birthday": self._field(person_obj, "birthday"),
+                "name": get_field(person_obj, "name"),
+                "birthday": get_field(person_obj, "birthday"),
                 "known_for_titles": known_for_titles,
             }
             self.cache.set_person_details(person_id, payload)
             return payload
         except Exception as e:
             logger.error(f"Failed to fetch person details for {person_id}: {e}")
+            self._remember_failure("person_details", person_id, e)
             return None
 
     def search_movies(self, query: str):
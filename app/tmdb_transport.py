@@ -0,0 +1,188 @@
+"""HTTP transport for the TMDb client with retries and a circuit breaker."""
+import time
+import random
+import logging
+import threading
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+from themoviedb import TMDb, TMDbError, TMDbHTTPError, TMDbRateLimitError, TMDbTimeoutError
+from themoviedb._core.config import ClientConfig
+from themoviedb._transports.sync import SyncTransport
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(TMDbError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fails fast for a cool-down window after repeated request failures.
+
+    After ``threshold`` consecutive failures the breaker opens and every call
+    is refused for ``cooldown`` seconds. The first call after that is let
+    through as a trial: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Return True if a request may be sent now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("TMDb circuit breaker closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning(
+                    f"TMDb circuit breaker opened after {self.failures} failures; "
+                    f"failing fast for {self.cooldown}s"
+                )
+            self._trial = False
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class ResilientTransport(SyncTransport):
+    """``SyncTransport`` that rate limits, retries and fails fast.
+
+    Every attempt takes a token from ``rate_limiter``. Timeouts, connection
+    errors and 5xx responses are retried up to ``TMDB_MAX_RETRIES`` times with
+    full-jitter exponential backoff; a 429 waits out its ``Retry-After`` and
+    holds back every other request sharing the rate limiter for that long.
+    A request that still fails, including a 429 that cannot be waited out
+    and any unexpected error, counts against the circuit breaker. Other 4xx
+    responses such as 404 are answers, not failures, and are raised
+    straight away.
+    """
+
+    def __init__(self, session=None, rate_limiter=None, breaker=None):
+        from .constants import (
+            TMDB_BREAKER_COOLDOWN, TMDB_BREAKER_THRESHOLD, TMDB_MAX_RETRIES, TMDB_RATE_LIMIT_BURST,
+            TMDB_RETRY_AFTER_MAX, TMDB_RETRY_BACKOFF, TMDB_RETRY_BACKOFF_MAX,
+        )
+
+        if session is None:
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=TMDB_RATE_LIMIT_BURST)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        super().__init__(session)
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker or CircuitBreaker(TMDB_BREAKER_THRESHOLD, TMDB_BREAKER_COOLDOWN)
+        self.max_retries = TMDB_MAX_RETRIES
+        self.backoff = TMDB_RETRY_BACKOFF
+        self.backoff_max = TMDB_RETRY_BACKOFF_MAX
+        self.retry_after_max = TMDB_RETRY_AFTER_MAX
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def send(self, request):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"TMDb circuit breaker is open; skipping {request.method} {request.url}")
+
+        # Every way out of the loop must report to the breaker, or a half-open
+        # trial would never finish and the breaker would refuse requests forever
+        succeeded = False
+        try:
+            attempt = 0
+            while True:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                self.requests += 1
+                try:
+                    response = super().send(request)
+                    succeeded = True
+                    return response
+                except TMDbRateLimitError as e:
+                    self.rate_limited += 1
+                    delay = e.retry_after if e.retry_after is not None else self._backoff_delay(attempt)
+                    if attempt >= self.max_retries or delay > self.retry_after_max:
+                        raise
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.penalize(delay)
+                    else:
+                        time.sleep(delay)
+                    logger.warning(f"TMDb rate limit hit; retrying in {delay:.1f}s")
+                except (TMDbTimeoutError, TMDbHTTPError, RequestException) as e:
+                    if isinstance(e, TMDbHTTPError) and e.status_code < 500:
+                        succeeded = True
+                        raise
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff_delay(attempt)
+                    logger.warning(f"TMDb request failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+                    time.sleep(delay)
+                attempt += 1
+                self.retries += 1
+        finally:
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _backoff_delay(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "breaker": self.breaker.stats(),
+        }
+
+
+def build_client(api_key, transport, host=None):
+    """Create a TMDb client that sends its requests through ``transport``.
+
+    ``host`` overrides the API host, e.g. to point the client at a local stub
+    server.
+    """
+    from .constants import TMDB_REQUEST_TIMEOUT
+
+    config = ClientConfig.from_values(api_key=api_key, timeout=TMDB_REQUEST_TIMEOUT)
+    if host:
+        config.host = host.rstrip("/")
+    return TMDb(_config=config, _transport=transport)
@@ -6,6 +6,11 @@ import hashlib
 import re
 import unicodedata
 from pathlib import Path
+from .cache_manager import FileStore, FramedStore
+from .eligibility import EligibilityIndex
+from .frame_extractor import FrameExtractionBusy, FrameExtractionPool
+from .path_resolver import PathResolver
+from .utils import get_field
 
 # Suppress OpenCV/FFmpeg H.264 error messages
 import logging
@@ -35,57 +40,56 @@ class TriviaEngine:
         # Framed game cache setup
         from .constants import FRAMED_CACHE_DIR, CAST_MATCH_CACHE_DIR
         self.framed_cache_dir = Path(FRAMED_CACHE_DIR)
-        self.framed_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.framed_store = FramedStore(self.framed_cache_dir)
+        self.frame_extractor = FrameExtractionPool()
         logger.info(f"Framed cache directory initialized: {self.framed_cache_dir.absolute()}")
 
         # Cast Match cache setup
         self.cast_match_cache_dir = Path(CAST_MATCH_CACHE_DIR)
-        self.cast_match_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cast_match_store = FileStore("cast_match", self.cast_match_cache_dir)
         self._actor_index = None
+        self._actor_index_generation = None
         self._director_list = None
+        self._director_list_generation = None
+
+        self.paths = PathResolver()
+        self.eligibility = EligibilityIndex(plex_service, self.paths)
         logger.info(f"Cast Match cache directory initialized: {self.cast_match_cache_dir.absolute()}")
 
-    def _get_cache_key(self, video_path, sample_rate=200):
+    def _get_cache_key(self, video_path):
         """Generate a cache key based on video file path, size, and modification time."""
         try:
             stat = os.stat(video_path)
-            # Include file path, size, modification time, and sample rate in hash
-            cache_data = f"{video_path}:{stat.st_size}:{stat.st_mtime}:{sample_rate}"
+            cache_data = f"{video_path}:{stat.st_size}:{stat.st_mtime}"
             return hashlib.md5(cache_data.encode()).hexdigest()
         except Exception as e:
             logger.error(f"Error generating cache key: {e}")
             return None
 
     def _get_tmdb_details(self, movie):
-        """Return TMDb metadata for the given Plex movie."""
-        if not self.tmdb:
+        """Return TMDb metadata for the given movie record."""
+        if not self.tmdb or not movie.tmdb_id:
             return None
+        return self.tmdb.get_movie_details(movie.tmdb_id)
 
-        tmdb_id = self._extract_tmdb_id(movie)
+    def tmdb_id_for(self, rating_key):
+        """Return the TMDb id for a Plex rating key, if the movie has one."""
+        return self.plex.get_tmdb_index().tmdb_by_key.get(rating_key)
 
-        if tmdb_id:
-            return self.tmdb.get_movie_details(tmdb_id)
-        return None
+    def movie_for_tmdb_id(self, tmdb_id):
+        """Return the library movie record matching a TMDb id, if any."""
+        return self.plex.get_tmdb_index().movie_by_tmdb.get(tmdb_id)
 
-    def _extract_tmdb_id(self, movie):
-        """Extract TMDb id from a Plex movie object if available."""
-        for guid in getattr(movie, "guids", []):
-            try:
-                gid = getattr(guid, "id", "")
-                if isinstance(gid, str) and gid.startswith("tmdb://"):
-                    return int(gid.split("tmdb://", 1)[1])
-            except Exception:
-                continue
-        return None
+    def movies_with_tmdb(self):
+        """Return the library movies that have TMDb metadata."""
+        return self.plex.get_tmdb_index().movies
 
-    @staticmethod
-    def _field(obj, key, default=None):
-        """Read a field from either dict-like or attribute-like objects."""
-        if obj is None:
-            return default
-        if isinstance(obj, dict):
-            return obj.get(key, default)
-        return getattr(obj, key, default)
+    def _plex_cast(self, movie, limit):
+        """Return Plex actors for a movie in the shape of TMDb cast entries."""
+        return [
+            {"name": name, "profile_path": None}
+            for name in self.plex.get_actors(movie)[:limit]
+        ]
 
     @staticmethod
     def _normalize_name(value):
@@ -125,34 +129,15 @@ class TriviaEngine:
         return " ".join(f"{initial}." for initial in initials) if initials else "Unknown"
 
     def _random_movie(self):
-        """Return a random movie from the Plex library."""
-        movies = self.plex.get_movies()
-        if not movies:
-            return None
-        return random.choice(movies)
-
-    def _get_random_movies(self, count=4, exclude_movie=None):
-        """Return a list of random movies from the Plex library."""
-        movies = self.plex.get_movies()
-        if not movies:
-            return []
-        
-        # Filter out the excluded movie if provided
-        if exclude_movie:
-            movies = [m for m in movies if m.title != exclude_movie.title]
-        
-        # If we don't have enough movies, return what we have
-        if len(movies) < count:
-            return movies
-        
-        return random.sample(movies, count)
+        """Return the next movie from the library's shuffle bag."""
+        return self.eligibility.choice("all")
 
     def random_question(self):
         movie = self._random_movie()
         if not movie:
             return None
-        question = f"Which movie features '{movie}'?"
-        return {"question": question, "answer": movie}
+        question = f"Which movie features '{movie.title}'?"
+        return {"question": question, "answer": movie.title}
 
     def cast_reveal(self):
         """Return the top few cast members for a random movie."""
@@ -160,31 +145,14 @@ class TriviaEngine:
         if not movie:
             return None
 
-        # Get TMDb ID first to get cast with photos
-        tmdb_id = None
-        for guid in getattr(movie, "guids", []):
-            try:
-                gid = getattr(guid, "id", "")
-                if isinstance(gid, str) and gid.startswith("tmdb://"):
-                    tmdb_id = int(gid.split("tmdb://", 1)[1])
-                    break
-            except Exception:
-                continue
-
         # Try to get cast with photos from TMDb
         cast_with_photos = []
-        if tmdb_id and self.tmdb:
-            cast_with_photos = self.tmdb.get_movie_cast(tmdb_id) or []
+        if movie.tmdb_id and self.tmdb:
+            cast_with_photos = self.tmdb.get_movie_cast(movie.tmdb_id) or []
 
         # Fallback to Plex cast data if TMDb not available
         if not cast_with_photos:
-            try:
-                cast_names = [actor.tag for actor in movie.actors][:12]
-                cast_with_photos = [
-                    {"name": name, "profile_path": None} for name in cast_names
-                ]
-            except Exception:
-                cast_with_photos = []
+            cast_with_photos = self._plex_cast(movie, 12)
 
         return {
             "title": movie.title,
@@ -193,44 +161,26 @@ class TriviaEngine:
 
     def guess_year(self):
         """Return the title and year for a random movie."""
-        movies = [m for m in self.plex.get_movies() if getattr(m, "year", None)]
-        if not movies:
+        movie = self.eligibility.choice("year")
+        if not movie:
             logger.warning("[Year] No movies with release years found in library")
             return None
 
-        movie = random.choice(movies)
         logger.info(f"[Year] Selected movie: {movie.title} ({movie.year})")
 
-        # Get TMDb ID first to get cast with photos
-        tmdb_id = None
-        for guid in getattr(movie, "guids", []):
-            try:
-                gid = getattr(guid, "id", "")
-                if isinstance(gid, str) and gid.startswith("tmdb://"):
-                    tmdb_id = int(gid.split("tmdb://", 1)[1])
-                    break
-            except Exception:
-                continue
-
         # Try to get cast with photos from TMDb
         cast_with_photos = []
-        if tmdb_id and self.tmdb:
-            cast_with_photos = self.tmdb.get_movie_cast(tmdb_id) or []
+        if movie.tmdb_id and self.tmdb:
+            cast_with_photos = self.tmdb.get_movie_cast(movie.tmdb_id) or []
 
         # Fallback to Plex cast data if TMDb not available
         if not cast_with_photos:
-            try:
-                cast_names = [actor.tag for actor in movie.actors][:4]
-                cast_with_photos = [
-                    {"name": name, "profile_path": None} for name in cast_names
-                ]
-            except Exception:
-                cast_with_photos = []
+            cast_with_photos = self._plex_cast(movie, 4)
 
         result = {
             "title": movie.title,
             "year": int(movie.year),
-            "summary": getattr(movie, "summary", "No summary available"),
+            "summary": movie.summary or "No summary available",
             "cast": cast_with_photos[:4],  # Limit to top 4 for year game
         }
 
@@ -258,13 +208,7 @@ class TriviaEngine:
 
         # Fallback to Plex poster
         if not poster:
-            if hasattr(movie, "thumbUrl"):
-                poster = movie.thumbUrl
-            elif self.plex.server:
-                try:
-                    poster = self.plex.server.url(movie.thumb)
-                except Exception:
-                    poster = None
+            poster = self.plex.get_thumb_url(movie)
 
         return {
             "title": movie.title,
@@ -273,240 +217,210 @@ class TriviaEngine:
         }
 
     def _get_video_file_path(self, movie):
-        """Get the actual video file path from a Plex movie object."""
+        """Get the actual video file path for a movie record."""
         try:
-            # Get the media parts for the movie
-            if hasattr(movie, "media") and movie.media:
-                for media in movie.media:
-                    if hasattr(media, "parts") and media.parts:
-                        for part in media.parts:
-                            if hasattr(part, "file"):
-                                file_path = part.file
-                                logger.debug(f"Original Plex file path: {file_path}")
-                                
-                                # Try the original path first
-                                if os.path.exists(file_path):
-                                    logger.debug(f"Found file at original path: {file_path}")
-                                    return file_path
-                                
-                                # Try alternative path mappings for Docker/container environments
-                                logger.debug(f"Original path not found, trying mapped paths...")
-                                mapped_paths = self._get_mapped_paths(file_path)
-                                logger.debug(f"Trying {len(mapped_paths)} mapped paths: {mapped_paths}")
-                                
-                                for mapped_path in mapped_paths:
-                                    logger.debug(f"Checking: {mapped_path}")
-                                    if os.path.exists(mapped_path):
-                                        logger.debug(f"Found file at mapped path: {mapped_path}")
-                                        return mapped_path
-                                
-                                logger.warning(f"No valid file path found for {movie.title}")
-            logger.warning(f"No media parts found for {movie.title}")
-            return None
+            video_path = self.paths.resolve(movie)
         except Exception as e:
             logger.error(f"Error getting video file path: {e}")
             return None
 
-    def _get_mapped_paths(self, original_path):
-        """Generate alternative file paths for different mount scenarios."""
-        mapped_paths = []
-        
-        # Get media path from environment variable
-        media_path = os.getenv("MEDIA_PATH", "/data/media")
-        
-        # Common Docker/NAS mount patterns
-        common_mounts = [
-            "/data/media",
-            "/media", 
-            "/mnt/media",
-            "/volume1/media",  # Synology
-            "/shares/media",   # Generic NAS
-            "/mnt/user/media", # Unraid
-        ]
-        
-        # Windows development scenario - convert Unix paths to Windows network shares
-        if os.name == 'nt':  # Windows
-            # Check if MEDIA_PATH is a Windows network path
-            if media_path.startswith('\\\\') or (len(media_path) > 1 and media_path[1] == ':'):
-                # For Windows development with network shares
-                for mount in common_mounts:
-                    if original_path.startswith(mount):
-                        # Get the relative path after the mount point
-                        relative_path = original_path[len(mount):].lstrip('/')
-                        # Convert forward slashes to backslashes for Windows
-                        relative_path = relative_path.replace('/', '\\')
-                        # Combine with Windows media path
-                        if media_path.endswith('\\'):
-                            mapped_path = media_path + relative_path
-                        else:
-                            mapped_path = media_path + '\\' + relative_path
-                        mapped_paths.append(mapped_path)
-                        break  # Only need one Windows mapping per mount
-            else:
-                # Fallback: If on Windows but MEDIA_PATH looks like Unix path, 
-                # try common Windows network share patterns
-                fallback_patterns = [
-                    "\\\\TOWER\\data\\media",
-                    "\\\\NAS\\data\\media", 
-                    "\\\\SERVER\\media",
-                    "\\\\UNRAID\\data\\media"
-                ]
-                
-                for fallback_path in fallback_patterns:
-                    for mount in common_mounts:
-                        if original_path.startswith(mount):
-                            # Get the relative path after the mount point
-                            relative_path = original_path[len(mount):].lstrip('/')
-                            # Convert forward slashes to backslashes for Windows
-                            relative_path = relative_path.replace('/', '\\')
-                            # Combine with fallback Windows path
-                            if fallback_path.endswith('\\'):
-                                mapped_path = fallback_path + relative_path
-                            else:
-                                mapped_path = fallback_path + '\\' + relative_path
-                            mapped_paths.append(mapped_path)
-                            break
-        
-        # Unix/Linux path mappings (for production on NAS or when not Windows)
-        # Only apply Unix mappings if not already handled by Windows logic or if not Windows
-        if os.name != 'nt' or not (media_path.startswith('\\\\') or (len(media_path) > 1 and media_path[1] == ':')):
-            # If the original path starts with any common mount, try replacing with our media path
-            for mount in common_mounts:
-                if original_path.startswith(mount):
-                    # Replace the mount prefix with our configured media path
-                    relative_path = original_path[len(mount):].lstrip('/')
-                    # Use forward slashes for Unix paths
-                    if media_path.startswith('/'):
-                        mapped_path = media_path.rstrip('/') + '/' + relative_path
-                    else:
-                        mapped_path = os.path.join(media_path, relative_path)
-                    mapped_paths.append(mapped_path)
-            
-            # Also try some common direct mappings for Unix systems
-            if original_path.startswith("/data/"):
-                # Map /data/xxx to /mnt/user/xxx (Unraid style)
-                unraid_path = original_path.replace("/data/", "/mnt/user/", 1)
-                mapped_paths.append(unraid_path)
-                
-                # Map /data/xxx to configured media path
-                relative_path = original_path[6:]  # Remove "/data/"
-                if media_path != "/data":
-                    if media_path.startswith('/'):
-                        direct_mapped = media_path.rstrip('/') + '/' + relative_path
-                    else:
-                        direct_mapped = os.path.join(media_path, relative_path)
-                    mapped_paths.append(direct_mapped)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_paths = []
-        for path in mapped_paths:
-            if path not in seen:
-                seen.add(path)
-                unique_paths.append(path)
-        
-        return unique_paths
-
-    def _extract_framed_frames(self, video_path, num_frames=7):
-        """Extract random frames from video for Framed game with caching."""
-        from .constants import FRAMED_FRAME_WIDTH, FRAMED_FRAME_HEIGHT
-        from .utils import safe_video_capture
-
-        cache_key = self._get_cache_key(video_path, sample_rate=num_frames)
+        if not video_path:
+            logger.warning(f"No valid file path found for {movie.title}")
+        return video_path
+
+    def _get_framed_pool(self, video_path):
+        """Return the cached pool of frames for a video, extracting it on first use."""
+        cache_key = self._get_cache_key(video_path)
+        if not cache_key:
+            return None
         cache_file = self.framed_cache_dir / f"{cache_key}.json"
 
         if cache_file.exists():
             try:
                 with open(cache_file, 'r') as f:
                     cached_data = json.load(f)
-                logger.debug(f"Using cached frames for Framed game: {cache_key}")
-                return cached_data
+                # The cache janitor evicts the least recently touched sets first
+                os.utime(cache_file)
+                self.framed_store.touch(cache_key)
+                logger.debug(f"Using cached frame pool for Framed game: {cache_key}")
+                return cached_data["frames"]
             except Exception as e:
                 logger.error(f"Error reading cached frames: {e}")
 
-        try:
-            with safe_video_capture(video_path) as cap:
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
+        pool = self._build_framed_pool(video_path, cache_key)
+        return pool["frames"] if pool else None
 
-                if total_frames < num_frames:
-                    logger.warning(f"Video has fewer frames ({total_frames}) than requested ({num_frames})")
-                    num_frames = total_frames
+    def _build_framed_pool(self, video_path, cache_key, previous=None, wait=None):
+        """Extract and index a video's frame pool, or top up the ``previous`` index.
 
-                frame_positions = sorted(random.sample(range(0, total_frames), num_frames))
+        ``wait`` is passed to ``FrameExtractionPool.extract``. Returns the pool
+        index, or None on failure.
+        """
+        from .constants import FRAMED_POOL_SIZE
 
-                frames_data = []
-                for frame_pos in frame_positions:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
-                    ret, frame = cap.read()
-
-                    if ret and frame is not None:
-                        resized = cv2.resize(frame, (FRAMED_FRAME_WIDTH, FRAMED_FRAME_HEIGHT))
+        cache_file = self.framed_cache_dir / f"{cache_key}.json"
+        existing = previous["frames"] if previous else []
+        epoch = self.framed_store.epoch
+        try:
+            result = self.frame_extractor.extract(
+                video_path, FRAMED_POOL_SIZE - len(existing), self.framed_cache_dir, cache_key, existing, wait
+            )
+            if result is None:
+                return None
+            if not result["frames"] and not previous:
+                return None
 
-                        frame_filename = f"{cache_key}_frame_{frame_pos}.jpg"
-                        frame_path = self.framed_cache_dir / frame_filename
+            pool = {
+                "frames": sorted(existing + result["frames"], key=lambda f: f["frame_number"]),
+                "extraction": result["extraction"],
+                "top_ups": previous.get("top_ups", 0) + 1 if previous else 0,
+            }
 
-                        success = cv2.imwrite(str(frame_path), resized, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            def write_index():
+                # Write the index last and atomically so a half-written set is never served
+                tmp_file = cache_file.with_suffix(".tmp")
+                with open(tmp_file, 'w') as f:
+                    json.dump(pool, f, separators=(',', ':'))
+                os.replace(tmp_file, cache_file)
+
+            # A cache clear during the extraction moved the frames written so far out of the directory
+            if not self.framed_store.commit(epoch, write_index):
+                for frame in result["frames"]:
+                    (self.framed_cache_dir / frame["filename"]).unlink(missing_ok=True)
+                raise FrameExtractionBusy(f"The frame cache was cleared while extracting {video_path}")
+            for frame in result["frames"]:
+                self.framed_store.add_file(self.framed_cache_dir / frame["filename"])
+            self.framed_store.add_file(cache_file)
+
+            return pool
+        except FrameExtractionBusy:
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting frames for Framed game: {e}")
+            return None
 
-                        if success:
-                            logger.info(f"Saved frame to: {frame_path}")
-                        else:
-                            logger.error(f"Failed to save frame to: {frame_path}")
-                            continue
+    def warm_framed_pool(self, movie, wait=None):
+        """Extract a movie's frame pool ahead of its first Framed game.
 
-                        frames_data.append({
-                            "frame_number": frame_pos,
-                            "time": frame_pos / fps if fps > 0 else 0,
-                            "filename": frame_filename
-                        })
+        A cached pool left short by rejected frames is topped up, at most
+        ``FRAMED_POOL_MAX_TOP_UPS`` times. ``wait`` is how long to wait for an
+        extraction slot before raising ``FrameExtractionBusy``. Returns the extraction stats when
+        frames were extracted, an empty dict if the pool was already complete,
+        or None if no frames could be extracted.
+        """
+        from .constants import FRAMED_POOL_MAX_TOP_UPS, FRAMED_POOL_SIZE
 
-                with open(cache_file, 'w') as f:
-                    json.dump(frames_data, f, separators=(',', ':'))
+        video_path = self._get_video_file_path(movie)
+        cache_key = self._get_cache_key(video_path) if video_path else None
+        if not cache_key:
+            self.eligibility.reject("framed", movie, transient=True)
+            return None
 
-                return frames_data
-        except Exception as e:
-            logger.error(f"Error extracting frames for Framed game: {e}")
+        previous = None
+        cache_file = self.framed_cache_dir / f"{cache_key}.json"
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r') as f:
+                    previous = json.load(f)
+            except Exception as e:
+                logger.error(f"Error reading cached frames: {e}")
+                return {}
+            if (
+                len(previous["frames"]) >= FRAMED_POOL_SIZE
+                or previous.get("top_ups", 0) >= FRAMED_POOL_MAX_TOP_UPS
+            ):
+                return {}
+
+        pool = self._build_framed_pool(video_path, cache_key, previous, wait)
+        if not pool:
+            self.paths.invalidate(movie)
+            self.eligibility.reject("framed", movie, transient=True)
             return None
+        return pool["extraction"]
+
+    def _cached_framed_fallback(self):
+        """Draw Framed movies until one has its frame pool on disk. Returns (movie, frames) or (None, None)."""
+        from .constants import FRAMED_BUSY_FALLBACK_DRAWS
 
-    def framed(self):
-        """Generate Framed game data - 7 random frames from a random movie."""
+        for _ in range(FRAMED_BUSY_FALLBACK_DRAWS):
+            movie = self.eligibility.choice("framed")
+            if not movie:
+                break
+            video_path = self._get_video_file_path(movie)
+            if video_path and self.framed_pool_cached(video_path):
+                try:
+                    pool = self._get_framed_pool(video_path)
+                except FrameExtractionBusy:
+                    continue
+                if pool:
+                    return movie, pool
+        return None, None
+
+    def framed_pool_cached(self, video_path):
+        """Return True if a video's frame pool is already on disk."""
+        cache_key = self._get_cache_key(video_path)
+        return bool(cache_key) and (self.framed_cache_dir / f"{cache_key}.json").exists()
+
+    def framed_next_ready(self):
+        """Return True if the next movie Framed will draw already has its frame pool on disk."""
+        upcoming = self.eligibility.upcoming("framed", 1)
+        if not upcoming:
+            return False
+        video_path = self._get_video_file_path(upcoming[0])
+        return bool(video_path) and self.framed_pool_cached(video_path)
+
+    def framed_payload_valid(self, payload):
+        """Return True if every frame of a buffered Framed payload is still cached, and mark its pool used."""
+        filenames = [frame["filename"] for frame in payload.get("frames", [])]
+        if not filenames or not all((self.framed_cache_dir / name).exists() for name in filenames):
+            return False
+        self.framed_store.touch(filenames[0].split("_frame_", 1)[0])
+        return True
+
+    def framed(self, cached_only=False):
+        """Generate Framed game data - 7 random frames from a random movie's frame pool.
+
+        With ``cached_only`` a movie whose pool is not extracted yet is
+        skipped instead of extracted, so background callers never start a
+        cold extraction; those are left to ``FramedPrefetcher``.
+        """
         from .constants import FRAMED_ROUNDS
 
-        movie = self._random_movie()
+        movie = self.eligibility.choice("framed")
         if not movie:
-            return {"error": "No movie found"}
+            return {"error": "No movies with readable video files found"}
 
         video_path = self._get_video_file_path(movie)
         if not video_path:
+            self.eligibility.reject("framed", movie, transient=True)
             return {"error": f"Could not find video file for: {movie.title}"}
+        if cached_only and not self.framed_pool_cached(video_path):
+            return {"error": f"Frames for {movie.title} are not extracted yet"}
 
-        frames_data = self._extract_framed_frames(video_path, FRAMED_ROUNDS)
-        if not frames_data:
+        try:
+            pool = self._get_framed_pool(video_path)
+        except FrameExtractionBusy:
+            logger.warning(f"[Framed] Extraction slots are busy; trying movies with extracted frames instead of {movie.title}")
+            movie, pool = self._cached_framed_fallback()
+            if not pool:
+                return {"error": "Frame extraction is busy, please try again shortly"}
+        if not pool:
+            # The cached path may be stale; re-check it when the movie is next eligible
+            self.paths.invalidate(movie)
+            self.eligibility.reject("framed", movie, transient=True)
             return {"error": f"Could not extract frames from: {movie.title}"}
 
-        tmdb_id = None
-        for guid in getattr(movie, "guids", []):
-            try:
-                gid = getattr(guid, "id", "")
-                if isinstance(gid, str) and gid.startswith("tmdb://"):
-                    tmdb_id = int(gid.split("tmdb://", 1)[1])
-                    break
-            except Exception:
-                continue
+        frames_data = sorted(
+            random.sample(pool, min(FRAMED_ROUNDS, len(pool))), key=lambda f: f["frame_number"]
+        )
 
-        tmdb_data = self._get_tmdb_details(movie) if tmdb_id else None
+        tmdb_data = self._get_tmdb_details(movie)
 
-        director = None
-        if tmdb_data and hasattr(tmdb_data, 'credits'):
-            crew = getattr(tmdb_data.credits, 'crew', [])
-            for person in crew:
-                if hasattr(person, 'job') and person.job == 'Director':
-                    director = person.name
-                    break
+        director = self.tmdb.director_from_details(tmdb_data) if self.tmdb else None
 
         cast = []
-        if tmdb_id and self.tmdb:
-            cast = (self.tmdb.get_movie_cast(tmdb_id) or [])[:5]
+        if movie.tmdb_id and self.tmdb:
+            cast = (self.tmdb.get_movie_cast(movie.tmdb_id) or [])[:5]
 
         awards = []
         if tmdb_data:
@@ -515,7 +429,7 @@ class TriviaEngine:
 
         return {
             "title": movie.title,
-            "year": getattr(movie, "year", None),
+            "year": movie.year,
             "director": director,
             "cast": cast,
             "awards": awards,
@@ -524,68 +438,31 @@ class TriviaEngine:
         }
 
     def _get_actor_index(self):
-        """Get or build actor-to-movies index with persistent caching."""
+        """Get or build the actor-to-movies index for the current library snapshot."""
         movies = self.plex.get_movies()
         if not movies:
             return None
 
-        library_size = len(movies)
-        cache_file = self.cast_match_cache_dir / "actor_index.json"
-        metadata_file = self.cast_match_cache_dir / "actor_index_metadata.json"
+        generation = self.plex.generation
+        if self._actor_index is not None and self._actor_index_generation == generation:
+            return self._actor_index
 
-        if cache_file.exists() and metadata_file.exists():
-            try:
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
-
-                if metadata.get('library_size') == library_size:
-                    logger.info(f"Using cached actor index for {library_size} movies")
-                    with open(cache_file, 'r') as f:
-                        cached_index = json.load(f)
-
-                    actor_index = {}
-                    for actor_name, movie_titles in cached_index.items():
-                        actor_index[actor_name] = [
-                            m for m in movies if m.title in movie_titles
-                        ]
-
-                    self._actor_index = actor_index
-                    return actor_index
-                else:
-                    logger.info(f"Library size changed ({metadata.get('library_size')} -> {library_size}), rebuilding index")
-            except Exception as e:
-                logger.error(f"Error reading cached actor index: {e}")
-
-        logger.info(f"Building new actor index for {library_size} movies...")
-        actor_movies = {}
+        logger.info(f"Building new actor index for {len(movies)} movies...")
+        actor_names = self.plex.catalog.actor_names
+        movies_by_actor_id = {}
 
         for movie in movies:
-            try:
-                for actor in getattr(movie, 'actors', []):
-                    actor_name = actor.tag
-                    if actor_name not in actor_movies:
-                        actor_movies[actor_name] = []
-                    actor_movies[actor_name].append(movie)
-            except Exception:
-                continue
+            for actor_id in movie.actor_ids:
+                movies_by_actor_id.setdefault(actor_id, []).append(movie)
 
-        cache_data = {
-            actor: [m.title for m in movie_list]
-            for actor, movie_list in actor_movies.items()
+        actor_movies = {
+            actor_names[actor_id]: movie_list
+            for actor_id, movie_list in movies_by_actor_id.items()
         }
-
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, separators=(',', ':'))
-
-            with open(metadata_file, 'w') as f:
-                json.dump({'library_size': library_size}, f)
-
-            logger.info(f"Cached actor index with {len(actor_movies)} actors")
-        except Exception as e:
-            logger.error(f"Error caching actor index: {e}")
+        logger.info(f"Built actor index with {len(actor_movies)} actors")
 
         self._actor_index = actor_movies
+        self._actor_index_generation = generation
         return actor_movies
 
     def get_all_directors(self):
@@ -594,7 +471,13 @@ class TriviaEngine:
         if not movies:
             return []
 
+        generation = self.plex.generation
+        if self._director_list is not None and self._director_list_generation == generation:
+            return self._director_list
+
         library_size = len(movies)
+        # An added, swapped or updated title raises the newest updatedAt even when the count stays the same
+        library_updated_at = max((movie.updated_at for movie in movies if movie.updated_at is not None), default=None)
         cache_file = self.cast_match_cache_dir / "director_list.json"
         metadata_file = self.cast_match_cache_dir / "director_list_metadata.json"
 
@@ -603,46 +486,41 @@ class TriviaEngine:
                 with open(metadata_file, 'r') as f:
                     metadata = json.load(f)
 
-                if metadata.get('library_size') == library_size:
+                if (
+                    metadata.get('library_size') == library_size
+                    and metadata.get('library_updated_at') == library_updated_at
+                ):
                     logger.info(f"Using cached director list for {library_size} movies")
                     with open(cache_file, 'r') as f:
                         self._director_list = json.load(f)
+                    self._director_list_generation = generation
                     return self._director_list
                 else:
-                    logger.info(f"Library size changed ({metadata.get('library_size')} -> {library_size}), rebuilding director list")
+                    logger.info(
+                        f"Library changed ({metadata.get('library_size')} -> {library_size} movies, last updated "
+                        f"{metadata.get('library_updated_at')} -> {library_updated_at}), rebuilding director list"
+                    )
             except Exception as e:
                 logger.error(f"Error reading cached director list: {e}")
 
         logger.info(f"Building director list for {library_size} movies...")
         directors = set()
 
-        for movie in movies:
-            tmdb_id = None
-            for guid in getattr(movie, "guids", []):
-                try:
-                    gid = getattr(guid, "id", "")
-                    if isinstance(gid, str) and gid.startswith("tmdb://"):
-                        tmdb_id = int(gid.split("tmdb://", 1)[1])
-                        break
-                except Exception:
-                    continue
-
-            if tmdb_id and self.tmdb:
-                tmdb_data = self._get_tmdb_details(movie)
-                if tmdb_data and hasattr(tmdb_data, 'credits'):
-                    crew = getattr(tmdb_data.credits, 'crew', [])
-                    for person in crew:
-                        if hasattr(person, 'job') and person.job == 'Director':
-                            directors.add(person.name)
+        for movie in self.movies_with_tmdb() if self.tmdb else []:
+            # Co-directed films credit every director
+            directors.update(self.tmdb.get_movie_directors(movie.tmdb_id))
 
         self._director_list = sorted(list(directors))
+        self._director_list_generation = generation
 
         try:
             with open(cache_file, 'w') as f:
                 json.dump(self._director_list, f)
+            self.cast_match_store.add_file(cache_file)
 
             with open(metadata_file, 'w') as f:
-                json.dump({'library_size': library_size}, f)
+                json.dump({'library_size': library_size, 'library_updated_at': library_updated_at}, f)
+            self.cast_match_store.add_file(metadata_file)
 
             logger.info(f"Cached {len(self._director_list)} unique directors")
         except Exception as e:
@@ -673,20 +551,9 @@ class TriviaEngine:
         movie_data = []
         for movie in actor_movie_list:
             logger.info(f"Processing movie: {movie.title}")
+            logger.info(f"TMDb ID for {movie.title}: {movie.tmdb_id}")
 
-            tmdb_id = None
-            for guid in getattr(movie, "guids", []):
-                try:
-                    gid = getattr(guid, "id", "")
-                    if isinstance(gid, str) and gid.startswith("tmdb://"):
-                        tmdb_id = int(gid.split("tmdb://", 1)[1])
-                        break
-                except Exception:
-                    continue
-
-            logger.info(f"TMDb ID for {movie.title}: {tmdb_id}")
-
-            tmdb_data = self._get_tmdb_details(movie) if tmdb_id else None
+            tmdb_data = self._get_tmdb_details(movie)
             logger.info(f"TMDb data retrieved for {movie.title}: {bool(tmdb_data)}")
 
             if tmdb_data:
@@ -695,21 +562,15 @@ class TriviaEngine:
                     logger.info(f"Credits available: {bool(tmdb_data.credits)}")
                     logger.info(f"Credits attributes: {dir(tmdb_data.credits)}")
 
-            director = None
-            if tmdb_data and hasattr(tmdb_data, 'credits'):
-                crew = getattr(tmdb_data.credits, 'crew', [])
-                logger.info(f"Crew count for {movie.title}: {len(crew) if crew else 0}")
-                for person in crew:
-                    if hasattr(person, 'job') and person.job == 'Director':
-                        director = person.name
-                        logger.info(f"Found director for {movie.title}: {director}")
-                        break
-                if not director:
-                    logger.warning(f"No director found in crew for {movie.title}")
+            director = self.tmdb.director_from_details(tmdb_data) if self.tmdb else None
+            if director:
+                logger.info(f"Found director for {movie.title}: {director}")
+            elif tmdb_data:
+                logger.warning(f"No director found in crew for {movie.title}")
 
             cast = []
-            if tmdb_id and self.tmdb:
-                all_cast = self.tmdb.get_movie_cast(tmdb_id) or []
+            if movie.tmdb_id and self.tmdb:
+                all_cast = self.tmdb.get_movie_cast(movie.tmdb_id) or []
                 logger.info(f"Cast count for {movie.title}: {len(all_cast)}")
                 cast = [c for c in all_cast if c["name"] != answer_actor][:5]
                 logger.info(f"Filtered cast (excluding {answer_actor}): {[c['name'] for c in cast]}")
@@ -718,16 +579,9 @@ class TriviaEngine:
             if tmdb_data and hasattr(tmdb_data, "poster_path") and tmdb_data.poster_path and self.tmdb:
                 poster = self.tmdb.get_poster_url(tmdb_data.poster_path, "w500")
                 logger.info(f"TMDb poster URL for {movie.title}: {poster}")
-            elif hasattr(movie, "thumbUrl"):
-                poster = movie.thumbUrl
-                logger.info(f"Plex thumbUrl for {movie.title}: {poster}")
-            elif self.plex.server:
-                try:
-                    poster = self.plex.server.url(movie.thumb)
-                    logger.info(f"Plex server thumb URL for {movie.title}: {poster}")
-                except Exception as e:
-                    logger.error(f"Error getting poster for {movie.title}: {e}")
-                    poster = None
+            else:
+                poster = self.plex.get_thumb_url(movie)
+                logger.info(f"Plex thumb URL for {movie.title}: {poster}")
 
             overview = None
             rating = None
@@ -749,7 +603,7 @@ class TriviaEngine:
 
             movie_dict = {
                 "title": movie.title,
-                "year": getattr(movie, "year", None),
+                "year": movie.year,
                 "director": director,
                 "cast": cast,
                 "poster": poster,
@@ -859,137 +713,134 @@ class TriviaEngine:
 
     def quote_game(self):
         """Generate Quote Game - guess movie from subtitle quotes."""
+        from .constants import QUOTE_MAX_ATTEMPTS
+
+        attempt = 0
+        while attempt < QUOTE_MAX_ATTEMPTS:
+            movie = self.eligibility.choice("quote")
+            if not movie:
+                break
+            attempt += 1
+            result = self._quote_game_for(movie, attempt)
+            if result:
+                return result
+            # A missing video file may come back (e.g. a remounted share); unusable subtitles
+            # only change with the Plex item, so those movies stay out of the pool
+            self.eligibility.reject("quote", movie, transient=not self._get_video_file_path(movie))
+
+        logger.error(f"[Quote] No movie with valid dialogue blocks found after {attempt} attempts")
+        return {"error": "Could not find a movie with suitable dialogue blocks. Please try again."}
+
+    def _quote_game_for(self, movie, attempt):
+        """Build a Quote Game payload from one movie, or return None if its dialogue is unusable."""
         from .constants import (
             QUOTE_ROUNDS, QUOTE_MIN_LENGTH, QUOTE_MAX_LENGTH,
             QUOTE_BLOCK_SIZE_MIN, QUOTE_BLOCK_SIZE_MAX, QUOTE_MAX_TIME_GAP_SECONDS
         )
 
-        # Try up to 10 movies to find one with valid dialogue blocks
-        for attempt in range(10):
-            movie = self._random_movie()
-            if not movie:
-                continue
+        video_path = self._get_video_file_path(movie)
+        if not video_path:
+            logger.info(f"[Quote] Attempt {attempt}: Could not find video file for {movie.title}")
+            return None
 
-            video_path = self._get_video_file_path(movie)
-            if not video_path:
-                logger.info(f"[Quote] Attempt {attempt + 1}: Could not find video file for {movie.title}")
-                continue
+        # Look for subtitle files (.srt) in the same directory
+        video_dir = Path(video_path).parent
+        subtitle_files = list(video_dir.glob("*.srt"))
 
-            # Look for subtitle files (.srt) in the same directory
-            video_dir = Path(video_path).parent
-            subtitle_files = list(video_dir.glob("*.srt"))
+        if not subtitle_files:
+            logger.info(f"[Quote] Attempt {attempt}: No subtitle files found for {movie.title}")
+            return None
 
-            if not subtitle_files:
-                logger.info(f"[Quote] Attempt {attempt + 1}: No subtitle files found for {movie.title}")
-                continue
+        logger.info(f"[Quote] Attempt {attempt}: Processing {movie.title}")
 
-            logger.info(f"[Quote] Attempt {attempt + 1}: Processing {movie.title}")
+        # Prioritize English/SDH subtitle files
+        subtitle_path = self._prioritize_subtitle_file(subtitle_files)
 
-            # Prioritize English/SDH subtitle files
-            subtitle_path = self._prioritize_subtitle_file(subtitle_files)
+        quotes = self._parse_srt_file(subtitle_path)
+        if not quotes or len(quotes) < QUOTE_ROUNDS * 3:
+            logger.info(f"[Quote] Attempt {attempt}: Not enough quotes ({len(quotes) if quotes else 0}) for {movie.title}")
+            return None
 
-            quotes = self._parse_srt_file(subtitle_path)
-            if not quotes or len(quotes) < QUOTE_ROUNDS * 3:
-                logger.info(f"[Quote] Attempt {attempt + 1}: Not enough quotes ({len(quotes) if quotes else 0}) for {movie.title}")
-                continue
+        logger.info(f"[Quote] Total quotes extracted: {len(quotes)}")
 
-            logger.info(f"[Quote] Total quotes extracted: {len(quotes)}")
+        # Filter quotes by length
+        filtered_quotes = [
+            q for q in quotes
+            if QUOTE_MIN_LENGTH <= len(q['text']) <= QUOTE_MAX_LENGTH
+        ]
 
-            # Filter quotes by length
-            filtered_quotes = [
-                q for q in quotes
-                if QUOTE_MIN_LENGTH <= len(q['text']) <= QUOTE_MAX_LENGTH
-            ]
+        logger.info(f"[Quote] Quotes after length filter ({QUOTE_MIN_LENGTH}-{QUOTE_MAX_LENGTH} chars): {len(filtered_quotes)}")
 
-            logger.info(f"[Quote] Quotes after length filter ({QUOTE_MIN_LENGTH}-{QUOTE_MAX_LENGTH} chars): {len(filtered_quotes)}")
+        if len(filtered_quotes) < QUOTE_ROUNDS * 3:
+            logger.info(f"[Quote] Not enough quotes in ideal range, relaxing to minimum length only")
+            filtered_quotes = [q for q in quotes if len(q['text']) >= QUOTE_MIN_LENGTH]
+            logger.info(f"[Quote] Quotes after relaxed filter (>={QUOTE_MIN_LENGTH} chars): {len(filtered_quotes)}")
 
-            if len(filtered_quotes) < QUOTE_ROUNDS * 3:
-                logger.info(f"[Quote] Not enough quotes in ideal range, relaxing to minimum length only")
-                filtered_quotes = [q for q in quotes if len(q['text']) >= QUOTE_MIN_LENGTH]
-                logger.info(f"[Quote] Quotes after relaxed filter (>={QUOTE_MIN_LENGTH} chars): {len(filtered_quotes)}")
+        if len(filtered_quotes) < QUOTE_ROUNDS * QUOTE_BLOCK_SIZE_MIN:
+            logger.info(f"[Quote] Attempt {attempt}: Still not enough quotes ({len(filtered_quotes)}) for {movie.title}")
+            return None
 
-            if len(filtered_quotes) < QUOTE_ROUNDS * QUOTE_BLOCK_SIZE_MIN:
-                logger.info(f"[Quote] Attempt {attempt + 1}: Still not enough quotes ({len(filtered_quotes)}) for {movie.title}")
-                continue
+        # Create dialogue blocks with time-gap checking to avoid scene changes
+        dialogue_blocks = []
+        i = 0
+        while i < len(filtered_quotes) - QUOTE_BLOCK_SIZE_MIN:
+            block_size = random.randint(QUOTE_BLOCK_SIZE_MIN, min(QUOTE_BLOCK_SIZE_MAX, len(filtered_quotes) - i))
 
-            # Create dialogue blocks with time-gap checking to avoid scene changes
-            dialogue_blocks = []
-            i = 0
-            while i < len(filtered_quotes) - QUOTE_BLOCK_SIZE_MIN:
-                block_size = random.randint(QUOTE_BLOCK_SIZE_MIN, min(QUOTE_BLOCK_SIZE_MAX, len(filtered_quotes) - i))
+            # Check if all quotes in this block are within the time gap threshold
+            block_candidate = filtered_quotes[i:i + block_size]
+            is_valid_block = True
 
-                # Check if all quotes in this block are within the time gap threshold
-                block_candidate = filtered_quotes[i:i + block_size]
-                is_valid_block = True
+            for j in range(len(block_candidate) - 1):
+                time1 = self._parse_timestamp_to_seconds(block_candidate[j]['timestamp'])
+                time2 = self._parse_timestamp_to_seconds(block_candidate[j + 1]['timestamp'])
+                time_gap = time2 - time1
 
-                for j in range(len(block_candidate) - 1):
-                    time1 = self._parse_timestamp_to_seconds(block_candidate[j]['timestamp'])
-                    time2 = self._parse_timestamp_to_seconds(block_candidate[j + 1]['timestamp'])
-                    time_gap = time2 - time1
+                if time_gap > QUOTE_MAX_TIME_GAP_SECONDS or time_gap < 0:
+                    is_valid_block = False
+                    logger.debug(f"[Quote] Rejecting block at index {i}: time gap {time_gap:.1f}s between quotes")
+                    break
 
-                    if time_gap > QUOTE_MAX_TIME_GAP_SECONDS or time_gap < 0:
-                        is_valid_block = False
-                        logger.debug(f"[Quote] Rejecting block at index {i}: time gap {time_gap:.1f}s between quotes")
-                        break
+            if is_valid_block:
+                dialogue_blocks.append(block_candidate)
+                logger.debug(f"[Quote] Valid block found at index {i} with {block_size} lines")
 
-                if is_valid_block:
-                    dialogue_blocks.append(block_candidate)
-                    logger.debug(f"[Quote] Valid block found at index {i} with {block_size} lines")
+            i += 1
 
-                i += 1
+        logger.info(f"[Quote] Created {len(dialogue_blocks)} valid dialogue blocks (time-gap filtered)")
 
-            logger.info(f"[Quote] Created {len(dialogue_blocks)} valid dialogue blocks (time-gap filtered)")
+        if len(dialogue_blocks) < QUOTE_ROUNDS:
+            logger.info(f"[Quote] Attempt {attempt}: Not enough dialogue blocks ({len(dialogue_blocks)}) for {movie.title}")
+            return None
 
-            if len(dialogue_blocks) < QUOTE_ROUNDS:
-                logger.info(f"[Quote] Attempt {attempt + 1}: Not enough dialogue blocks ({len(dialogue_blocks)}) for {movie.title}")
-                continue
+        # Select random dialogue blocks
+        selected_quotes = random.sample(dialogue_blocks, QUOTE_ROUNDS)
 
-            # Select random dialogue blocks
-            selected_quotes = random.sample(dialogue_blocks, QUOTE_ROUNDS)
-
-            logger.info(f"[Quote] Selected {len(selected_quotes)} dialogue blocks for {movie.title}")
-
-            # Log the actual selected dialogue blocks for debugging
-            for idx, block in enumerate(selected_quotes):
-                logger.info(f"[Quote] Round {idx + 1} dialogue block ({len(block)} lines):")
-                for line_idx, quote_obj in enumerate(block):
-                    text = quote_obj['text']
-                    timestamp = quote_obj['timestamp']
-                    logger.info(f"[Quote]   [{timestamp}] Line {line_idx + 1}: {text[:70]}{'...' if len(text) > 70 else ''}")
-
-                # Log time span of the block
-                if len(block) > 1:
-                    start_time = self._parse_timestamp_to_seconds(block[0]['timestamp'])
-                    end_time = self._parse_timestamp_to_seconds(block[-1]['timestamp'])
-                    time_span = end_time - start_time
-                    logger.info(f"[Quote]   Time span: {time_span:.1f} seconds")
-
-            # Get TMDb data
-            tmdb_id = None
-            for guid in getattr(movie, "guids", []):
-                try:
-                    gid = getattr(guid, "id", "")
-                    if isinstance(gid, str) and gid.startswith("tmdb://"):
-                        tmdb_id = int(gid.split("tmdb://", 1)[1])
-                        break
-                except Exception:
-                    continue
+        logger.info(f"[Quote] Selected {len(selected_quotes)} dialogue blocks for {movie.title}")
 
-            tmdb_data = self._get_tmdb_details(movie) if tmdb_id else None
+        # Log the actual selected dialogue blocks for debugging
+        for idx, block in enumerate(selected_quotes):
+            logger.info(f"[Quote] Round {idx + 1} dialogue block ({len(block)} lines):")
+            for line_idx, quote_obj in enumerate(block):
+                text = quote_obj['text']
+                timestamp = quote_obj['timestamp']
+                logger.info(f"[Quote]   [{timestamp}] Line {line_idx + 1}: {text[:70]}{'...' if len(text) > 70 else ''}")
 
-            # Concatenate dialogue lines into single text blocks with ellipsis
-            selected_quotes_text = ['... ' + ' '.join([q['text'] for q in block]) + ' ...' for block in selected_quotes]
+            # Log time span of the block
+            if len(block) > 1:
+                start_time = self._parse_timestamp_to_seconds(block[0]['timestamp'])
+                end_time = self._parse_timestamp_to_seconds(block[-1]['timestamp'])
+                time_span = end_time - start_time
+                logger.info(f"[Quote]   Time span: {time_span:.1f} seconds")
 
-            return {
-                "title": movie.title,
-                "year": getattr(movie, "year", None),
-                "quotes": selected_quotes_text,
-                "total_rounds": QUOTE_ROUNDS,
-            }
+        # Concatenate dialogue lines into single text blocks with ellipsis
+        selected_quotes_text = ['... ' + ' '.join([q['text'] for q in block]) + ' ...' for block in selected_quotes]
 
-        # If we get here, all 10 attempts failed
-        logger.error("[Quote] Failed to find a movie with valid dialogue blocks after 10 attempts")
-        return {"error": "Could not find a movie with suitable dialogue blocks. Please try again."}
+        return {
+            "title": movie.title,
+            "year": movie.year,
+            "quotes": selected_quotes_text,
+            "total_rounds": QUOTE_ROUNDS,
+        }
 
     def _name_the_cast_profile_score(self, billing_order, popularity, library_count):
         """Score cast members using billing, popularity, and library familiarity."""
@@ -1074,40 +925,22 @@ class TriviaEngine:
 
         return other_titles
 
-    def _name_the_cast_movie_director(self, tmdb_data):
-        """Extract director from TMDb credits."""
-        credits = self._field(tmdb_data, "credits")
-        crew = self._field(credits, "crew", []) or []
-        for person in crew:
-            if self._field(person, "job") == "Director":
-                return self._field(person, "name")
-        return None
-
     def _name_the_cast_movie_genres(self, tmdb_data):
         """Extract genre names from TMDb details."""
         genres = []
-        for genre in self._field(tmdb_data, "genres", []) or []:
-            name = self._field(genre, "name")
+        for genre in get_field(tmdb_data, "genres", []) or []:
+            name = get_field(genre, "name")
             if name:
                 genres.append(name)
         return genres
 
     def _name_the_cast_movie_poster(self, movie, tmdb_data):
         """Resolve poster URL with TMDb-first fallback to Plex."""
-        poster_path = self._field(tmdb_data, "poster_path")
+        poster_path = get_field(tmdb_data, "poster_path")
         if poster_path and self.tmdb:
             return self.tmdb.get_poster_url(poster_path, "w500")
 
-        if hasattr(movie, "thumbUrl"):
-            return movie.thumbUrl
-
-        if self.plex.server:
-            try:
-                return self.plex.server.url(movie.thumb)
-            except Exception:
-                return None
-
-        return None
+        return self.plex.get_thumb_url(movie)
 
     def name_the_cast(self):
         """Generate Name the Cast game payload."""
@@ -1119,8 +952,7 @@ class TriviaEngine:
             NAME_THE_CAST_SCORE_BY_ROUND,
         )
 
-        movies = self.plex.get_movies()
-        if not movies:
+        if not self.eligibility.pool("name_the_cast"):
             return {"error": "No movies found in library"}
 
         actor_index = self._get_actor_index() or {}
@@ -1138,20 +970,23 @@ class TriviaEngine:
             )
 
         for attempt in range(NAME_THE_CAST_MAX_ATTEMPTS):
-            movie = random.choice(movies)
-            tmdb_id = self._extract_tmdb_id(movie)
-            tmdb_data = self._get_tmdb_details(movie) if tmdb_id else None
+            movie = self.eligibility.choice("name_the_cast")
+            if not movie:
+                break
+            tmdb_data = self._get_tmdb_details(movie)
 
             cast_pool = []
-            if tmdb_id and self.tmdb:
-                cast_pool = self.tmdb.get_movie_cast_extended(tmdb_id) or []
+            if movie.tmdb_id and self.tmdb:
+                cast_pool = self.tmdb.get_movie_cast_extended(movie.tmdb_id) or []
+            # Without TMDb data the movie may qualify once TMDb answers again
+            tmdb_missing = bool(movie.tmdb_id and self.tmdb and not cast_pool)
 
             if not cast_pool:
-                plex_actors = getattr(movie, "actors", []) or []
+                plex_actors = self.plex.get_actors(movie)
                 cast_pool = [
                     {
                         "id": None,
-                        "name": getattr(actor, "tag", None),
+                        "name": actor,
                         "character": None,
                         "order": idx,
                         "popularity": None,
@@ -1163,7 +998,7 @@ class TriviaEngine:
             candidates = []
             seen_names = set()
             for idx, actor in enumerate(cast_pool[:NAME_THE_CAST_CAST_POOL]):
-                name = self._field(actor, "name")
+                name = get_field(actor, "name")
                 normalized_name = self._normalize_name(name)
                 if not normalized_name or normalized_name in seen_names:
                     continue
@@ -1171,20 +1006,20 @@ class TriviaEngine:
 
                 library_movies = actor_lookup.get(normalized_name, [])
                 profile_score = self._name_the_cast_profile_score(
-                    self._field(actor, "order", idx),
-                    self._field(actor, "popularity"),
+                    get_field(actor, "order", idx),
+                    get_field(actor, "popularity"),
                     len(library_movies),
                 )
 
                 candidates.append(
                     {
-                        "id": self._field(actor, "id"),
+                        "id": get_field(actor, "id"),
                         "name": name,
                         "normalized_name": normalized_name,
-                        "character": self._field(actor, "character"),
-                        "order": self._field(actor, "order", idx),
-                        "popularity": self._field(actor, "popularity"),
-                        "profile_path": self._field(actor, "profile_path"),
+                        "character": get_field(actor, "character"),
+                        "order": get_field(actor, "order", idx),
+                        "popularity": get_field(actor, "popularity"),
+                        "profile_path": get_field(actor, "profile_path"),
                         "library_movies": library_movies,
                         "profile_score": profile_score,
                     }
@@ -1194,6 +1029,7 @@ class TriviaEngine:
                 logger.info(
                     f"[NameTheCast] Attempt {attempt + 1}: not enough cast candidates for {movie.title}"
                 )
+                self.eligibility.reject("name_the_cast", movie, transient=tmdb_missing)
                 continue
 
             candidates.sort(key=lambda c: (-c["profile_score"], c["order"]))
@@ -1207,8 +1043,8 @@ class TriviaEngine:
                 if actor_id and self.tmdb:
                     person_details = self.tmdb.get_person_details(actor_id)
 
-                birthday = self._field(person_details, "birthday")
-                known_for_titles = self._field(person_details, "known_for_titles", []) or []
+                birthday = get_field(person_details, "birthday")
+                known_for_titles = get_field(person_details, "known_for_titles", []) or []
                 other_titles = self._name_the_cast_other_titles(
                     movie.title,
                     actor.get("library_movies", []),
@@ -1231,14 +1067,15 @@ class TriviaEngine:
                 )
 
             if len(targets) < NAME_THE_CAST_MIN_ACTORS:
+                self.eligibility.reject("name_the_cast", movie, transient=tmdb_missing)
                 continue
 
             return {
                 "title": movie.title,
-                "year": getattr(movie, "year", None),
-                "summary": getattr(movie, "summary", "No summary available"),
+                "year": movie.year,
+                "summary": movie.summary or "No summary available",
                 "poster": self._name_the_cast_movie_poster(movie, tmdb_data),
-                "director": self._name_the_cast_movie_director(tmdb_data),
+                "director": self.tmdb.director_from_details(tmdb_data) if self.tmdb else None,
                 "genres": self._name_the_cast_movie_genres(tmdb_data),
                 "required_count": len(targets),
                 "targets": targets,
@@ -1260,58 +1097,33 @@ class TriviaEngine:
 
         logger.info(f"[Timeline] Selected movie: {movie.title} ({movie.year})")
 
-        tmdb_id = None
-        for guid in getattr(movie, "guids", []):
-            try:
-                gid = getattr(guid, "id", "")
-                if isinstance(gid, str) and gid.startswith("tmdb://"):
-                    tmdb_id = int(gid.split("tmdb://", 1)[1])
-                    break
-            except Exception as e:
-                logger.warning(f"[Timeline] Error parsing guid: {e}")
-                continue
-
-        logger.info(f"[Timeline] TMDb ID: {tmdb_id}")
+        logger.info(f"[Timeline] TMDb ID: {movie.tmdb_id}")
 
         cast_with_photos = []
-        if tmdb_id and self.tmdb:
+        if movie.tmdb_id and self.tmdb:
             logger.info("[Timeline] Fetching cast from TMDb")
-            cast_with_photos = self.tmdb.get_movie_cast(tmdb_id) or []
+            cast_with_photos = self.tmdb.get_movie_cast(movie.tmdb_id) or []
             logger.info(f"[Timeline] Got {len(cast_with_photos)} cast members from TMDb")
 
         if not cast_with_photos:
             logger.info("[Timeline] No TMDb cast, falling back to Plex actors")
-            try:
-                cast_names = [actor.tag for actor in movie.actors][:12]
-                cast_with_photos = [
-                    {"name": name, "profile_path": None} for name in cast_names
-                ]
-                logger.info(f"[Timeline] Got {len(cast_with_photos)} actors from Plex")
-            except Exception as e:
-                logger.error(f"[Timeline] Error getting Plex actors: {e}")
-                cast_with_photos = []
+            cast_with_photos = self._plex_cast(movie, 12)
+            logger.info(f"[Timeline] Got {len(cast_with_photos)} actors from Plex")
 
         logger.info("[Timeline] Fetching TMDb details for director")
-        tmdb = self._get_tmdb_details(movie) if tmdb_id else None
+        tmdb = self._get_tmdb_details(movie)
         logger.info(f"[Timeline] TMDb details fetched: {tmdb is not None}, has credits: {hasattr(tmdb, 'credits') if tmdb else False}")
 
-        director = None
-        if tmdb and hasattr(tmdb, 'credits'):
-            crew = getattr(tmdb.credits, 'crew', [])
-            logger.info(f"[Timeline] Searching {len(crew)} crew members for director")
-            for person in crew:
-                if hasattr(person, 'job') and person.job == 'Director':
-                    director = person.name
-                    logger.info(f"[Timeline] Found director: {director}")
-                    break
-
-        if not director:
+        director = self.tmdb.director_from_details(tmdb) if self.tmdb else None
+        if director:
+            logger.info(f"[Timeline] Found director: {director}")
+        else:
             logger.warning(f"[Timeline] No director found for {movie.title}")
 
         result = {
             "title": movie.title,
             "year": movie.year,
-            "summary": getattr(movie, "summary", "No summary available"),
+            "summary": movie.summary or "No summary available",
             "cast": cast_with_photos[:12],
             "director": director,
         }
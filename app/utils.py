@@ -13,6 +13,14 @@ def handle_trivia_response(result, error_message="No media found"):
         return jsonify(result), 404
     return jsonify(result)
 
+def get_field(obj, key, default=None):
+    """Read a field from either dict-like or attribute-like objects."""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
 def with_error_handling(func):
     """Decorator for consistent error handling across endpoints."""
     @wraps(func)
@@ -34,7 +42,14 @@ def safe_video_capture(video_path):
             self.cap = None
             
         def __enter__(self):
-            self.cap = cv2.VideoCapture(self.path)
+            from .constants import VIDEO_BACKEND_TIMEOUT
+
+            timeout_ms = VIDEO_BACKEND_TIMEOUT * 1000
+            self.cap = cv2.VideoCapture(
+                self.path,
+                cv2.CAP_ANY,
+                [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms],
+            )
             return self.cap
             
         def __exit__(self, exc_type, exc_val, exc_tb):